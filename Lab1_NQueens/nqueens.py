@@ -1,63 +1,207 @@
 import sys
+from time import time
+import numpy as np
 import matplotlib
 matplotlib.use("Qt5Agg")
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.colors import ListedColormap
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QMessageBox, QGraphicsDropShadowEffect
 )
 from PyQt5.QtGui import QPixmap, QColor, QFont
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+
+from nqueens_solver import iter_n_queens, min_conflicts_n_queens, kth_solution
+from nqueens_store import SolutionWriter, load_solutions, read_solution, cached_count_index, enough_space
 
 # ============ 全局变量 ============
-success_count = []
-current_index = 0
-
-# ============ n 皇后算法 ============
-def solve_n_queens(n):
-    success_count = []
-    label_y = [0] * n
-    label_up = [0] * (2 * n - 1)
-    label_do = [0] * (2 * n - 1)
-    board = [-1] * n
-
-    def search(r):
-        if r == n:
-            success_count.append(board[:])
-            return
-        for c in range(n):
-            if not label_y[c] and not label_up[r + c] and not label_do[r - c + n - 1]:
-                board[r] = c
-                label_y[c] = label_up[r + c] = label_do[r - c + n - 1] = 1
-                search(r + 1)
-                label_y[c] = label_up[r + c] = label_do[r - c + n - 1] = 0
-
-    search(0)
-    return success_count
+PROGRESS_PERIOD = 0.1   # 进度信号的最短间隔（秒）
+GRID_LINE_MAX = 64      # n 不超过该值时画格线，更大时格线会糊成一片
+CELL_DRAW_MAX = 200     # n 超过该值时改为降采样的栅格图
+RASTER_SIZE = 600       # 降采样栅格图的边长（像素格）
+ENUMERATE_MAX_N = 16    # n 超过该值时不再枚举，改用局部搜索给出单个解（n = 16 的解集约 236 MB）
+board_n = 0             # 当前棋盘大小
+search_worker = None    # 后台搜索线程
+solutions = None        # 缓存命中或搜索完成后的内存映射解集
+solution_path = None    # 搜索进行中时正在写入的文件
+found_count = 0         # 已写入文件、可以查看的解数
+total_count = None      # 搜索结束后才知道总解数
+current_index = -1      # -1 表示还没有显示任何解
+local_seed = 0          # 局部搜索模式下当前解的随机种子
+index_worker = None     # 后台构建计数索引的线程
+count_index = None      # 计数索引，可直接求任意编号的解
+jump_target = None      # 等索引建好后要跳转到的编号（从 0 开始）
+waiting_next = False    # 新解尚未写出时用户已点了"下一个解法"
+
+# ============ 后台搜索 ============
+class SearchWorker(QThread):
+    """在后台线程中运行 iter_n_queens，把解追加写入缓存文件。
+
+    界面按下标从文件中读取解，内存占用与解的总数无关；
+    取消标志在每 PROGRESS_INTERVAL 个节点检查一次。"""
+    solutions_ready = pyqtSignal(int)       # 文件中可读取的解数
+    progress = pyqtSignal(int, int, float)  # 节点数、已找到解数、节点/秒
+    search_done = pyqtSignal(int, bool)     # 解数、是否被取消
+
+    def __init__(self, n):
+        super().__init__()
+        self.n = n
+        self._cancelled = False
+        self.writer = SolutionWriter(n)
+
+    def cancel(self):
+        self._cancelled = True
+
+    def _flush(self):
+        before = self.writer.count
+        self.writer.flush()
+        if self.writer.count != before:
+            self.solutions_ready.emit(self.writer.count)
+
+    def run(self):
+        start_time = last_time = time()
+
+        def report(nodes, found):
+            nonlocal last_time
+            now = time()
+            if now - last_time >= PROGRESS_PERIOD:
+                last_time = now
+                self._flush()
+                self.progress.emit(nodes, found, nodes / max(now - start_time, 1e-9))
+            return self._cancelled
+
+        for queens in iter_n_queens(self.n, progress=report):
+            self.writer.append(queens)
+            if self.writer.count == 0:
+                # 第一个解立即写出，界面无需等到下一次进度回调
+                self._flush()
+            if self._cancelled:
+                break
+        # 改名由界面线程在 search_done 中完成，避免与读取冲突
+        self._flush()
+        self.writer.close()
+        self.search_done.emit(self.writer.count, self._cancelled)
+
+class LocalSearchWorker(QThread):
+    """大 n 时在后台用最小冲突局部搜索求一个解。"""
+    progress = pyqtSignal(int, int)        # 尝试交换次数、剩余冲突数
+    search_done = pyqtSignal(object, bool)  # 解（取消时为 None）、是否被取消
+
+    def __init__(self, n, seed):
+        super().__init__()
+        self.n = n
+        self.seed = seed
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        last_time = time()
+
+        def report(steps, conflicts):
+            nonlocal last_time
+            now = time()
+            if now - last_time >= PROGRESS_PERIOD:
+                last_time = now
+                self.progress.emit(steps, conflicts)
+            return self._cancelled
+
+        board = min_conflicts_n_queens(self.n, seed=self.seed, progress=report)
+        self.search_done.emit(board, self._cancelled)
+
+class IndexWorker(QThread):
+    """在后台读取或构建计数索引，供"跳转到第 k 种解"使用。"""
+    progress = pyqtSignal(int, int)        # 已统计的前缀数、前缀总数
+    index_ready = pyqtSignal(object, bool)  # 索引（取消时为 None）、是否被取消
+
+    def __init__(self, n):
+        super().__init__()
+        self.n = n
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        last_time = time()
+
+        def report(done, total):
+            nonlocal last_time
+            now = time()
+            if now - last_time >= PROGRESS_PERIOD:
+                last_time = now
+                self.progress.emit(done, total)
+            return self._cancelled
+
+        index = cached_count_index(self.n, progress=report)
+        self.index_ready.emit(index, self._cancelled)
 
 # ============ 绘制棋盘 ============
-def draw_board(n, queens):
-    fig, ax = plt.subplots(figsize=(6, 6), dpi=120)
-    ax.set_xlim(0, n)
-    ax.set_ylim(0, n)
-    ax.set_xticks([])
-    ax.set_yticks([])
-    ax.set_aspect('equal')
-
-    for i in range(n):
-        for j in range(n):
-            color = 'white' if (i + j) % 2 == 0 else 'lightgrey'
-            rect = plt.Rectangle((j, n - i - 1), 1, 1, facecolor=color, edgecolor='black', lw=1.5)
-            ax.add_patch(rect)
-
-    for r, c in enumerate(queens):
-        ax.text(c + 0.5, n - r - 0.5, "♛", ha='center', va='center', fontsize=28, color='black')
-
-    fig.patch.set_alpha(0)
-    ax.patch.set_alpha(0)
-    plt.close(fig)
-    return fig
+class BoardCanvas(FigureCanvas):
+    """大小为 n 的棋盘画布。
+
+    棋盘格只用一张 imshow 图像画一次；全部皇后是一个 scatter，
+    换解时只改坐标，恢复缓存的底图后重画皇后并 blit。
+    n > CELL_DRAW_MAX 时不画格子，皇后画在 RASTER_SIZE 见方的降采样栅格上。"""
+
+    def __init__(self, n):
+        fig = Figure(figsize=(6, 6), dpi=120)
+        super().__init__(fig)
+        self.n = n
+        ax = fig.add_subplot(111)
+        ax.set_xlim(0, n)
+        ax.set_ylim(0, n)
+        ax.set_xticks([])
+        ax.set_yticks([])
+        ax.set_aspect('equal')
+
+        if n > CELL_DRAW_MAX:
+            self.raster = min(n, RASTER_SIZE)
+            self.queens = ax.imshow(np.zeros((self.raster, self.raster), dtype=np.uint8),
+                                    cmap=ListedColormap(['lightgrey', 'black']), vmin=0, vmax=1,
+                                    extent=(0, n, 0, n), interpolation='nearest', animated=True)
+        else:
+            self.raster = None
+            board = np.indices((n, n)).sum(axis=0) % 2
+            ax.imshow(board, cmap=ListedColormap(['white', 'lightgrey']), vmin=0, vmax=1,
+                      extent=(0, n, 0, n), interpolation='nearest')
+            if n <= GRID_LINE_MAX:
+                ax.hlines(range(n + 1), 0, n, colors='black', lw=1.5)
+                ax.vlines(range(n + 1), 0, n, colors='black', lw=1.5)
+
+            # 原来 8 皇后时字号约 28pt，按格子边长缩放
+            cell = 6 * 72 / n
+            self.queens = ax.scatter([], [], marker="$♛$", s=(0.6 * cell) ** 2, c='black', animated=True)
+
+        fig.patch.set_alpha(0)
+        ax.patch.set_alpha(0)
+        self.ax = ax
+        self.background = None
+        self.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        # 完整重绘（首次显示、窗口缩放）后重新缓存底图
+        self.background = self.copy_from_bbox(self.figure.bbox)
+        self.ax.draw_artist(self.queens)
+
+    def set_queens(self, queens):
+        n = self.n
+        if self.raster:
+            # 每个栅格像素对应 (n / raster)^2 个格子，其中有皇后即涂黑
+            image = np.zeros((self.raster, self.raster), dtype=np.uint8)
+            image[np.arange(n) * self.raster // n, np.asarray(queens) * self.raster // n] = 1
+            self.queens.set_data(image)
+        else:
+            self.queens.set_offsets([(c + 0.5, n - r - 0.5) for r, c in enumerate(queens)])
+        if self.background is None:
+            self.draw()
+            return
+        self.restore_region(self.background)
+        self.ax.draw_artist(self.queens)
+        self.blit(self.figure.bbox)
 
 # ============ 主窗口 ============
 class NQueenApp(QMainWindow):
@@ -129,7 +273,9 @@ class NQueenApp(QMainWindow):
 
         self.run_btn = QPushButton("执行")
         self.next_btn = QPushButton("下一个解法")
-        for btn in [self.run_btn, self.next_btn]:
+        self.cancel_btn = QPushButton("取消")
+        self.cancel_btn.setEnabled(False)
+        for btn in [self.run_btn, self.next_btn, self.cancel_btn]:
             btn.setStyleSheet("""
                 QPushButton {
                     background-color: rgba(255,255,255,180);
@@ -145,8 +291,23 @@ class NQueenApp(QMainWindow):
 
         self.run_btn.clicked.connect(self.run)
         self.next_btn.clicked.connect(self.show_next)
+        self.cancel_btn.clicked.connect(self.cancel)
         control_layout.addWidget(self.run_btn)
         control_layout.addWidget(self.next_btn)
+        control_layout.addWidget(self.cancel_btn)
+
+        jump_row = QHBoxLayout()
+        self.jump_input = QLineEdit()
+        self.jump_input.setFixedWidth(80)
+        self.jump_input.setPlaceholderText("第 k 种")
+        self.jump_input.setStyleSheet(self.input.styleSheet())
+        self.jump_btn = QPushButton("跳转")
+        self.jump_btn.setStyleSheet(self.run_btn.styleSheet())
+        self.jump_btn.setCursor(Qt.PointingHandCursor)
+        self.jump_btn.clicked.connect(self.jump)
+        jump_row.addWidget(self.jump_input)
+        jump_row.addWidget(self.jump_btn)
+        control_layout.addLayout(jump_row)
 
         self.info_label = QLabel(" ")
         self.info_label.setStyleSheet("font-size:13px; color:white;")
@@ -160,35 +321,262 @@ class NQueenApp(QMainWindow):
         super().resizeEvent(event)
         self.bg_label.resize(self.size())
 
+    def closeEvent(self, event):
+        self._stop_index()
+        self._stop_search()
+        super().closeEvent(event)
+
     # --------- 功能 ---------
     def run(self):
-        global success_count, current_index
+        global board_n
         text = self.input.text().strip()
         if not text.isdigit() or int(text) <= 0:
             QMessageBox.warning(self, "错误", "请输入正整数n。")
             return
-        n = int(text)
+        board_n = int(text)
+        self._clear_canvas()
+        self._stop_search()
+        cached = None if board_n > ENUMERATE_MAX_N else load_solutions(board_n)
+        if cached is not None:
+            self._show_set(cached)
+        elif board_n > ENUMERATE_MAX_N or not enough_space(board_n):
+            # 解太多，或磁盘放不下全部解：只用局部搜索给出单个解
+            self._reset_view()
+            self._start_local_search(0)
+        else:
+            self._start_search()
 
-        QApplication.processEvents()
+    def show_next(self):
+        global current_index, waiting_next
+        if search_worker is None and solutions is None:
+            QMessageBox.information(self, "提示", "请先执行计算。")
+            return
+        if isinstance(search_worker, LocalSearchWorker):
+            # 局部搜索没有解的编号，换一个随机种子再求一个
+            if not search_worker.isRunning():
+                self._start_local_search(local_seed + 1)
+        elif current_index + 1 < self._available():
+            current_index += 1
+            self._show_current()
+        elif total_count is None and search_worker is not None and search_worker.isRunning():
+            waiting_next = True
+            self.info_label.setText(f"正在搜索第 {current_index + 2} 种解……")
+        elif found_count or total_count:
+            # 全部解已看完，从头开始
+            current_index = 0
+            self._show_current()
+
+    def jump(self):
+        global current_index, jump_target
+        text = self.jump_input.text().strip()
+        if not text.isdigit() or int(text) <= 0:
+            QMessageBox.warning(self, "错误", "请输入正整数k。")
+            return
+        k = int(text) - 1
+        if board_n == 0 or isinstance(search_worker, LocalSearchWorker):
+            QMessageBox.information(self, "提示", "请先执行计算（局部搜索模式不支持跳转）。")
+            return
+        if k < self._available():
+            current_index = k
+            self._show_current()
+        elif total_count is not None:
+            QMessageBox.warning(self, "错误", f"共 {total_count} 种解，没有第 {k + 1} 种。")
+        else:
+            # 还没搜到第 k 种：借助计数索引直接定位
+            jump_target = k
+            self._start_index()
+
+    def cancel(self):
+        if index_worker is not None and index_worker.isRunning():
+            index_worker.cancel()
+        elif search_worker is not None and search_worker.isRunning():
+            search_worker.cancel()
+
+    def _available(self):
+        # 可以直接查看的解数：有计数索引时为总解数，否则为已写出的解数
+        if count_index is not None:
+            return total_count
+        return found_count
+
+    def _start_index(self):
+        global index_worker
+        if index_worker is not None and index_worker.isRunning():
+            return
+        index_worker = IndexWorker(board_n)
+        index_worker.progress.connect(self._on_index_progress)
+        index_worker.index_ready.connect(self._on_index_ready)
+        self.cancel_btn.setEnabled(True)
+        self.info_label.setText("正在构建计数索引……")
+        index_worker.start()
+
+    def _stop_index(self):
+        global index_worker
+        if index_worker is not None:
+            index_worker.disconnect()
+            index_worker.cancel()
+            index_worker.wait()
+            index_worker = None
+
+    def _on_index_progress(self, done, total):
+        if self.sender() is not index_worker:
+            return
+        self.info_label.setText(f"正在构建计数索引：{done} / {total}")
 
-        success_count = solve_n_queens(n)
+    def _on_index_ready(self, index, cancelled):
+        global count_index, total_count, current_index, jump_target
+        if self.sender() is not index_worker:
+            return
+        self.cancel_btn.setEnabled(search_worker is not None and search_worker.isRunning())
+        if cancelled:
+            self.info_label.setText("已取消构建计数索引")
+            return
+        count_index = index
+        total_count = sum(index[1])
+        if jump_target is not None and jump_target < total_count:
+            current_index = jump_target
+            self._show_current()
+        elif jump_target is not None:
+            QMessageBox.warning(self, "错误", f"共 {total_count} 种解，没有第 {jump_target + 1} 种。")
+            self._show_info()
+        jump_target = None
+
+    def _reset_view(self):
+        global solutions, solution_path, found_count, total_count, current_index, waiting_next
+        global count_index, jump_target
+        self._stop_index()
+        count_index = None
+        jump_target = None
+        solutions = None
+        solution_path = None
+        found_count = 0
+        total_count = None
+        current_index = -1
+        waiting_next = False
+
+    def _show_set(self, cached):
+        # 命中缓存：直接按下标随机访问内存映射
+        global solutions, found_count, total_count, current_index
+        self._reset_view()
+        solutions = cached
+        found_count = total_count = len(cached)
+        if not total_count:
+            self.info_label.setText("无解")
+            return
         current_index = 0
-        if not success_count:
+        self._show_current()
+
+    def _start_search(self):
+        global search_worker, solution_path
+        self._reset_view()
+        search_worker = SearchWorker(board_n)
+        solution_path = search_worker.writer.path
+        search_worker.solutions_ready.connect(self._on_solutions)
+        search_worker.progress.connect(self._on_progress)
+        search_worker.search_done.connect(self._on_done)
+        self.cancel_btn.setEnabled(True)
+        self.info_label.setText("搜索中……")
+        search_worker.start()
+
+    def _start_local_search(self, seed):
+        global search_worker, local_seed
+        self._stop_search()
+        local_seed = seed
+        search_worker = LocalSearchWorker(board_n, seed)
+        search_worker.progress.connect(self._on_local_progress)
+        search_worker.search_done.connect(self._on_local_done)
+        self.cancel_btn.setEnabled(True)
+        self.info_label.setText(f"n = {board_n} 的解集过大，不枚举\n局部搜索中……")
+        search_worker.start()
+
+    def _stop_search(self):
+        # 旧线程的信号断开后再取消，避免迟到的结果混进新的搜索
+        global search_worker
+        if search_worker is not None:
+            search_worker.disconnect()
+            search_worker.cancel()
+            search_worker.wait()
+            if isinstance(search_worker, SearchWorker):
+                # 信号已断开，_on_done 不会再处理：未完成的临时文件在这里删除
+                search_worker.writer.discard()
+            search_worker = None
+            self.cancel_btn.setEnabled(False)
+
+    def _solution(self, k):
+        if solutions is not None and k < len(solutions):
+            return solutions[k].tolist()
+        if solution_path is not None and k < found_count:
+            return read_solution(solution_path, board_n, k)
+        return kth_solution(board_n, k, count_index)
+
+    def _on_solutions(self, count):
+        global found_count, current_index, waiting_next
+        if self.sender() is not search_worker:
+            return
+        found_count = count
+        if current_index < 0 or waiting_next:
+            # 搜索仍在进行时先显示已找到的解
+            current_index += 1
+            waiting_next = False
+            self._show_current()
+
+    def _on_progress(self, nodes, found, rate):
+        if self.sender() is not search_worker:
+            return
+        text = f"搜索中：已探索 {nodes} 个节点\n已找到 {found} 种解（{rate:.0f} 节点/秒）"
+        if current_index >= 0:
+            text += f"\n当前第 {current_index + 1} 种"
+        self.info_label.setText(text)
+
+    def _on_done(self, found, cancelled):
+        global total_count, solutions, solution_path
+        if self.sender() is not search_worker:
+            return
+        self.cancel_btn.setEnabled(index_worker is not None and index_worker.isRunning())
+        if cancelled:
+            # 不在磁盘上留下不完整的解集：已找到的解读进内存后删除临时文件
+            partial = load_solutions(board_n, solution_path)
+            solutions = np.array(partial)
+            del partial
+            solution_path = None
+            search_worker.writer.discard()
+            self.info_label.setText(f"已取消，共找到 {found} 种解")
+            return
+        total_count = found
+        if not found:
             self.info_label.setText("无解")
             self._clear_canvas()
-        else:
-            self.info_label.setText(f"共 {len(success_count)} 种解。当前第 1 种")
-            self.show_solution(n, success_count[0])
+        search_worker.writer.commit()
+        solution_path = search_worker.writer.path
+        solutions = load_solutions(board_n, solution_path)
+        if found:
+            self._show_info()
+
+    def _on_local_progress(self, steps, conflicts):
+        if self.sender() is not search_worker:
+            return
+        self.info_label.setText(f"局部搜索中：已尝试 {steps} 次交换\n剩余冲突 {conflicts}")
 
-    def show_next(self):
-        global current_index
-        if not success_count:
-            QMessageBox.information(self, "提示", "请先执行计算。")
+    def _on_local_done(self, board, cancelled):
+        if self.sender() is not search_worker:
             return
-        n = len(success_count[0])
-        current_index = (current_index + 1) % len(success_count)
-        self.info_label.setText(f"共 {len(success_count)} 种解。当前第 {current_index + 1} 种")
-        self.show_solution(n, success_count[current_index])
+        self.cancel_btn.setEnabled(False)
+        if cancelled:
+            self.info_label.setText("已取消")
+        elif board is None:
+            self.info_label.setText("无解")
+        else:
+            self.info_label.setText(f"n = {board_n}，局部搜索得到的第 {local_seed + 1} 个随机解")
+            self.show_solution(board_n, board)
+
+    def _show_info(self):
+        if total_count is None:
+            self.info_label.setText(f"已找到 {found_count} 种以上解。当前第 {current_index + 1} 种")
+        else:
+            self.info_label.setText(f"共 {total_count} 种解。当前第 {current_index + 1} 种")
+
+    def _show_current(self):
+        self._show_info()
+        self.show_solution(board_n, self._solution(current_index))
 
     def _clear_canvas(self):
         if self.canvas:
@@ -196,12 +584,13 @@ class NQueenApp(QMainWindow):
             self.canvas = None
 
     def show_solution(self, n, queens):
-        self._clear_canvas()
-        fig = draw_board(n, queens)
-        self.canvas = FigureCanvas(fig)
-        self.canvas.setStyleSheet("background: transparent;")
-        self.canvas_container.addWidget(self.canvas, alignment=Qt.AlignCenter)
-        self.canvas.draw()
+        # 同一个 n 复用画布，只移动皇后
+        if self.canvas is None or self.canvas.n != n:
+            self._clear_canvas()
+            self.canvas = BoardCanvas(n)
+            self.canvas.setStyleSheet("background: transparent;")
+            self.canvas_container.addWidget(self.canvas, alignment=Qt.AlignCenter)
+        self.canvas.set_queens(queens)
 
 
 # ============ 主程序 ============
@@ -0,0 +1,437 @@
+import os
+import sys
+import random
+import argparse
+from bisect import bisect_right
+from itertools import accumulate
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from time import time
+
+PARALLEL_MIN_N = 12  # n 小于该值时进程启动开销大于收益，直接串行
+PROGRESS_INTERVAL = 4096  # 每搜索这么多个节点回调一次 progress
+GREEDY_TAIL = 32  # 局部搜索初始化时最后这么多行直接随机放置
+INDEX_DEPTH = 4  # 计数索引记录到第几行的前缀
+
+# ============ 位运算求解核心 ============
+# 第 c 列对应二进制第 c 位；cols / ld / rd 分别记录已占用的列、
+# 主对角线（向左下传播）与副对角线（向右下传播）。
+# 每次取最低位 avail & -avail，保证按列号从小到大搜索，
+# 与原递归版本的解顺序（字典序）完全一致。
+
+def _count_bits(full, cols, ld, rd, rest):
+    # rest 为尚未放置皇后的行数；只剩一行时可用位的个数即为解数
+    avail = full & ~(cols | ld | rd)
+    if rest == 1:
+        return bin(avail).count("1")
+    total = 0
+    while avail:
+        bit = avail & -avail
+        avail ^= bit
+        total += _count_bits(full, cols | bit, ((ld | bit) << 1) & full, (rd | bit) >> 1, rest - 1)
+    return total
+
+def _search_bits(full, cols, ld, rd, board, out):
+    avail = full & ~(cols | ld | rd)
+    r = len(board)
+    board.append(0)
+    while avail:
+        bit = avail & -avail
+        avail ^= bit
+        board[r] = bit.bit_length() - 1
+        nc = cols | bit
+        if nc == full:
+            out.append(board[:])
+        else:
+            _search_bits(full, nc, ((ld | bit) << 1) & full, (rd | bit) >> 1, board, out)
+    board.pop()
+
+def _first_row_solutions(n, c):
+    """第一行皇后放在第 c 列时的全部解（字典序）。"""
+    full = (1 << n) - 1
+    bit = 1 << c
+    out = []
+    if n == 1:
+        return [[0]]
+    _search_bits(full, bit, (bit << 1) & full, bit >> 1, [c], out)
+    return out
+
+def _mirror(solution, n):
+    return [n - 1 - c for c in solution]
+
+# ============ 多进程拆分 ============
+# 按前两行的列选择把搜索树切成互不相交的子树，每个子树交给一个进程。
+# 子任务按字典序提交、按提交顺序取回结果，因此合并后的顺序与串行一致。
+
+def _resolve_workers(workers):
+    if workers is None:
+        return os.cpu_count() or 1
+    return max(1, workers)
+
+def _prefixes(n, first_cols):
+    return [(c0, c1) for c0 in first_cols for c1 in range(n) if abs(c1 - c0) > 1]
+
+def _prefix_state(full, prefix):
+    cols = ld = rd = 0
+    for c in prefix:
+        bit = 1 << c
+        cols |= bit
+        ld = ((ld | bit) << 1) & full
+        rd = (rd | bit) >> 1
+    return cols, ld, rd
+
+def _count_prefix(task):
+    n, prefix = task
+    if len(prefix) == n:
+        return 1
+    full = (1 << n) - 1
+    cols, ld, rd = _prefix_state(full, prefix)
+    return _count_bits(full, cols, ld, rd, n - len(prefix))
+
+def _solve_prefix(task):
+    n, prefix = task
+    full = (1 << n) - 1
+    cols, ld, rd = _prefix_state(full, prefix)
+    out = []
+    _search_bits(full, cols, ld, rd, list(prefix), out)
+    return out
+
+def _ordered_results(func, tasks, workers):
+    """按任务顺序逐个产出结果；同时在跑的任务不超过 2 * workers 个，
+    避免结果堆积在主进程里。"""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        tasks = iter(tasks)
+        for task in tasks:
+            pending.append(pool.submit(func, task))
+            if len(pending) >= 2 * workers:
+                break
+        while pending:
+            result = pending.popleft().result()
+            task = next(tasks, None)
+            if task is not None:
+                pending.append(pool.submit(func, task))
+            yield result
+
+# ============ 对外接口 ============
+def count_n_queens(n, workers=1):
+    """只统计解的个数，不构造棋盘。
+
+    利用左右镜像对称：第一行只搜索左半边的列，结果乘 2；
+    n 为奇数时再单独加上第一行放在中间列的解数。
+    workers > 1（None 表示全部 CPU）时按前两行拆分给进程池。"""
+    if n <= 0:
+        return 0
+    workers = _resolve_workers(workers)
+    if workers > 1 and n >= PARALLEL_MIN_N:
+        half = n // 2
+        tasks = [(n, p) for p in _prefixes(n, range(half))]
+        total = 2 * sum(_ordered_results(_count_prefix, tasks, workers))
+        if n % 2 == 1:
+            tasks = [(n, p) for p in _prefixes(n, [half])]
+            total += sum(_ordered_results(_count_prefix, tasks, workers))
+        return total
+    full = (1 << n) - 1
+    total = 0
+    for c in range(n // 2):
+        bit = 1 << c
+        total += _count_bits(full, bit, (bit << 1) & full, bit >> 1, n - 1) if n > 1 else 1
+    total *= 2
+    if n % 2 == 1:
+        bit = 1 << (n // 2)
+        total += _count_bits(full, bit, (bit << 1) & full, bit >> 1, n - 1) if n > 1 else 1
+    return total
+
+def solve_n_queens(n, workers=1):
+    """返回全部解（每个解为 board[r] = c 的列表），顺序与逐列回溯一致。
+
+    只搜索第一行左半边的列，右半边的解由镜像得到：
+    镜像会把字典序反转，因此对应分组需逆序输出。"""
+    if n <= 0:
+        return []
+    half = n // 2
+    first_cols = range(half + n % 2)
+    workers = _resolve_workers(workers)
+    if workers > 1 and n >= PARALLEL_MIN_N:
+        groups = [[] for _ in first_cols]
+        tasks = [(n, p) for p in _prefixes(n, first_cols)]
+        for (_, prefix), part in zip(tasks, _ordered_results(_solve_prefix, tasks, workers)):
+            groups[prefix[0]].extend(part)
+    else:
+        groups = [_first_row_solutions(n, c) for c in first_cols]
+    solutions = []
+    for group in groups:
+        solutions.extend(group)
+    groups = groups[:half]
+    for c in range(n - half, n):
+        group = groups[n - 1 - c]
+        solutions.extend(_mirror(s, n) for s in reversed(group))
+    return solutions
+
+def iter_n_queens(n, workers=1, progress=None):
+    """以生成器形式逐个产出解，顺序与 solve_n_queens 相同。
+
+    搜索状态（每行的可用位、列与对角线占用）保存在显式栈里，
+    每次 next() 从上次停下的位置继续，内存占用只与 n 有关。
+    多进程模式下按前两行的子树依次产出，最多缓存 2 * workers 个子树的解。
+
+    progress(nodes, found) 每搜索 PROGRESS_INTERVAL 个节点及结束时各调用一次，
+    返回 True 表示取消，生成器随即结束（仅串行模式支持）。"""
+    if n <= 0:
+        return
+    workers = _resolve_workers(workers)
+    if workers > 1 and n >= PARALLEL_MIN_N and progress is None:
+        tasks = [(n, p) for p in _prefixes(n, range(n))]
+        for part in _ordered_results(_solve_prefix, tasks, workers):
+            yield from part
+        return
+    full = (1 << n) - 1
+    board = [0] * n
+    avail = [0] * n
+    cols = [0] * n
+    lds = [0] * n
+    rds = [0] * n
+    avail[0] = full
+    nodes = found = 0
+    next_report = PROGRESS_INTERVAL if progress is not None else -1
+    r = 0
+    while r >= 0:
+        a = avail[r]
+        if not a:
+            r -= 1
+            continue
+        bit = a & -a
+        avail[r] = a ^ bit
+        board[r] = bit.bit_length() - 1
+        nodes += 1
+        if nodes == next_report:
+            next_report += PROGRESS_INTERVAL
+            if progress(nodes, found):
+                return
+        if r == n - 1:
+            found += 1
+            yield board[:]
+            continue
+        c = cols[r] | bit
+        ld = ((lds[r] | bit) << 1) & full
+        rd = (rds[r] | bit) >> 1
+        r += 1
+        cols[r], lds[r], rds[r] = c, ld, rd
+        avail[r] = full & ~(c | ld | rd)
+    if progress is not None:
+        progress(nodes, found)
+
+# ============ 按编号直接定位 ============
+# 计数索引：前 depth 行所有合法摆法（按字典序）及其下方子树的解数。
+# 求第 k 个解时先在前缀的累计解数上二分，再逐行往下：
+# 对每个候选列统计子树解数，k 落在哪棵子树就进入哪棵，其余整棵跳过。
+
+def _valid_prefixes(n, depth):
+    full = (1 << n) - 1
+    out = []
+
+    def extend(prefix, cols, ld, rd):
+        if len(prefix) == depth:
+            out.append(tuple(prefix))
+            return
+        avail = full & ~(cols | ld | rd)
+        while avail:
+            bit = avail & -avail
+            avail ^= bit
+            prefix.append(bit.bit_length() - 1)
+            extend(prefix, cols | bit, ((ld | bit) << 1) & full, (rd | bit) >> 1)
+            prefix.pop()
+
+    extend([], 0, 0, 0)
+    return out
+
+def build_count_index(n, depth=None, workers=1, progress=None):
+    """统计前 depth 行每种合法摆法下的解数，返回 (prefixes, counts)。
+
+    镜像前缀的解数相同，只统计第一行在左半边（含中间列）的前缀。
+    progress(done, total) 每统计完一个前缀调用一次，返回 True 表示取消，此时返回 None。"""
+    if depth is None:
+        depth = max(1, min(INDEX_DEPTH, n - 1))
+    prefixes = _valid_prefixes(n, depth)
+    tasks = [(n, p) for p in prefixes if p[0] < (n + 1) // 2]
+    workers = _resolve_workers(workers)
+    if workers > 1:
+        results = _ordered_results(_count_prefix, tasks, workers)
+    else:
+        results = map(_count_prefix, tasks)
+    known = {}
+    for done, ((_, prefix), count) in enumerate(zip(tasks, results), 1):
+        known[prefix] = count
+        if progress is not None and progress(done, len(tasks)):
+            return None
+    counts = [known[p] if p in known else known[tuple(n - 1 - c for c in p)] for p in prefixes]
+    return prefixes, counts
+
+def kth_solution(n, k, index):
+    """返回 solve_n_queens(n)[k]，但不枚举前面的解；index 为 build_count_index 的结果。"""
+    prefixes, counts = index
+    starts = [0] + list(accumulate(counts))
+    if not 0 <= k < starts[-1]:
+        raise IndexError(f"n = {n} 只有 {starts[-1]} 个解，第 {k} 个不存在")
+    i = bisect_right(starts, k) - 1
+    k -= starts[i]
+    board = list(prefixes[i])
+    full = (1 << n) - 1
+    cols, ld, rd = _prefix_state(full, board)
+    for r in range(len(board), n):
+        avail = full & ~(cols | ld | rd)
+        while avail:
+            bit = avail & -avail
+            avail ^= bit
+            nc, nl, nr = cols | bit, ((ld | bit) << 1) & full, (rd | bit) >> 1
+            count = _count_bits(full, nc, nl, nr, n - r - 1) if r < n - 1 else 1
+            if k < count:
+                break
+            k -= count
+        board.append(bit.bit_length() - 1)
+        cols, ld, rd = nc, nl, nr
+    return board
+
+# ============ 局部搜索（只求一个解） ============
+# 排列模型 board[r] = c：列天然不冲突，只需维护两组对角线计数。
+# conflicts 为所有对角线上 max(0, 皇后数 - 1) 之和，放入/移走一个皇后
+# 时只改两个计数，O(1) 即可更新。
+
+def is_solution(board):
+    n = len(board)
+    return (len(set(board)) == n
+            and len({r + c for r, c in enumerate(board)}) == n
+            and len({r - c for r, c in enumerate(board)}) == n)
+
+def min_conflicts_n_queens(n, seed=None, max_steps=None, progress=None):
+    """用最小冲突 / 迭代修复求一个解，适用于无法枚举的大 n（可到 10^6 量级）。
+
+    初始化时逐行从剩余列中随机挑选不冲突的列（最后 GREEDY_TAIL 行随机放），
+    之后反复对仍有冲突的行与随机一行交换列，只接受使冲突数下降的交换。
+    max_steps 为每轮尝试交换的上限，用完后换随机数重新开始；
+    progress(steps, conflicts) 每 PROGRESS_INTERVAL 次尝试调用一次，返回 True 表示取消。
+    n = 2、3 无解，返回 None；取消时也返回 None。"""
+    if n <= 0 or n in (2, 3):
+        return None
+    if n == 1:
+        return [0]
+    rng = random.Random(seed)
+    if max_steps is None:
+        max_steps = 50 * n + 100
+    while True:
+        board, up, down, conflicts = _greedy_board(n, rng)
+        steps = 0
+        while conflicts and steps < max_steps:
+            attacked = [r for r in range(n) if up[r + board[r]] > 1 or down[r - board[r] + n - 1] > 1]
+            for i in attacked:
+                # 同一行反复尝试，直到该行不再受攻击
+                while (up[i + board[i]] > 1 or down[i - board[i] + n - 1] > 1) and steps < max_steps:
+                    steps += 1
+                    if progress is not None and steps % PROGRESS_INTERVAL == 0 and progress(steps, conflicts):
+                        return None
+                    j = rng.randrange(n)
+                    if j != i:
+                        conflicts = _try_swap(board, up, down, n, i, j, conflicts)
+        if not conflicts:
+            if progress is not None:
+                progress(steps, 0)
+            return board
+
+def _try_swap(board, up, down, n, i, j, conflicts):
+    """交换第 i、j 行的列，冲突数下降则保留，否则撤销；返回新的冲突数。"""
+    ci, cj = board[i], board[j]
+    after = (conflicts
+             - _remove(up, down, n, i, ci) - _remove(up, down, n, j, cj)
+             + _place(up, down, n, i, cj) + _place(up, down, n, j, ci))
+    if after < conflicts:
+        board[i], board[j] = cj, ci
+        return after
+    _remove(up, down, n, i, cj)
+    _remove(up, down, n, j, ci)
+    _place(up, down, n, i, ci)
+    _place(up, down, n, j, cj)
+    return conflicts
+
+def _place(up, down, n, r, c):
+    # 返回新增的冲突数
+    added = (up[r + c] > 0) + (down[r - c + n - 1] > 0)
+    up[r + c] += 1
+    down[r - c + n - 1] += 1
+    return added
+
+def _remove(up, down, n, r, c):
+    up[r + c] -= 1
+    down[r - c + n - 1] -= 1
+    return (up[r + c] > 0) + (down[r - c + n - 1] > 0)
+
+def _greedy_board(n, rng):
+    board = list(range(n))
+    up = [0] * (2 * n - 1)
+    down = [0] * (2 * n - 1)
+    conflicts = 0
+    tail = min(n, GREEDY_TAIL)
+    for i in range(n):
+        if i < n - tail:
+            # 在剩余列中随机试几次，找不冲突的列
+            for _ in range(n - i):
+                j = rng.randrange(i, n)
+                c = board[j]
+                if not up[i + c] and not down[i - c + n - 1]:
+                    break
+        else:
+            j = rng.randrange(i, n)
+        board[i], board[j] = board[j], board[i]
+        conflicts += _place(up, down, n, i, board[i])
+    return board, up, down, conflicts
+
+# ============ 命令行 ============
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="N 皇后求解（位运算 + 镜像剪枝）")
+    parser.add_argument("n", type=int, help="棋盘大小 n")
+    parser.add_argument("--count", action="store_true", help="只输出解的个数，不构造棋盘")
+    parser.add_argument("--one", action="store_true", help="用局部搜索只求一个解（适用于很大的 n）")
+    parser.add_argument("--seed", type=int, default=None, help="局部搜索的随机种子")
+    parser.add_argument("--kth", type=int, default=None, metavar="K",
+                        help="借助计数索引直接求第 K 个解（从 0 开始），索引保存在 cache/ 下")
+    parser.add_argument("--cache", action="store_true", help="读取或生成 cache/ 下的解集缓存")
+    parser.add_argument("--show", type=int, default=0, metavar="K", help="打印前 K 个解")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="进程数，0 表示使用全部 CPU（n < %d 时自动串行）" % PARALLEL_MIN_N)
+    args = parser.parse_args(argv)
+
+    workers = args.workers or None
+
+    start_time = time()
+    if args.one:
+        board = min_conflicts_n_queens(args.n, seed=args.seed)
+        if board is None:
+            print(f"n = {args.n} 无解")
+        else:
+            if args.show:
+                print(board[:args.show])
+            print(f"n = {args.n}，找到一个解（校验：{is_solution(board)}），用时 {time() - start_time:.3f} 秒")
+        return
+    if args.kth is not None:
+        from nqueens_store import cached_count_index
+        index = cached_count_index(args.n, workers)
+        try:
+            print(kth_solution(args.n, args.kth, index))
+        except IndexError as e:
+            print(e)
+        print(f"n = {args.n}，共 {sum(index[1])} 种解，用时 {time() - start_time:.3f} 秒")
+        return
+    for i, s in enumerate(iter_n_queens(args.n)):
+        if i >= args.show:
+            break
+        print(s)
+    if args.cache:
+        from nqueens_store import cached_solutions
+        total = len(cached_solutions(args.n, workers))
+    elif args.count:
+        total = count_n_queens(args.n, workers)
+    else:
+        total = len(solve_n_queens(args.n, workers))
+    print(f"n = {args.n}，共 {total} 种解，用时 {time() - start_time:.3f} 秒")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+import os
+import shutil
+import numpy as np
+
+from nqueens_solver import iter_n_queens, build_count_index
+
+# ============ 紧凑存储 ============
+# 每个解占一行 n 个整数（第 r 行皇后所在的列），n <= 256 时用 uint8，
+# 否则用 uint16。文件就是按行连续排列的原始数组，没有文件头，
+# 解数由文件大小推出，因此可以边搜索边追加、边读取。
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+FLUSH_ROWS = 4096  # 写入缓冲的行数
+# n 皇后的解数（OEIS A000170），用来在搜索前估算缓存文件的大小
+KNOWN_COUNTS = {1: 1, 2: 0, 3: 0, 4: 2, 5: 10, 6: 4, 7: 40, 8: 92, 9: 352, 10: 724,
+                11: 2680, 12: 14200, 13: 73712, 14: 365596, 15: 2279184, 16: 14772512,
+                17: 95815104, 18: 666090624, 19: 4968057848, 20: 39029188884}
+
+def solution_dtype(n):
+    return np.dtype(np.uint8 if n <= 256 else np.uint16)
+
+def cache_path(n, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"queens_{n}.{solution_dtype(n).name}")
+
+def partial_path(n, cache_dir=CACHE_DIR):
+    """搜索尚未完成时写入的临时文件，完成后改名为 cache_path。"""
+    return cache_path(n, cache_dir) + ".part"
+
+def expected_size(n):
+    """全部解写入缓存后的文件字节数；解数未知时返回 None。"""
+    if n not in KNOWN_COUNTS:
+        return None
+    return KNOWN_COUNTS[n] * n * solution_dtype(n).itemsize
+
+def enough_space(n, cache_dir=CACHE_DIR):
+    """缓存目录所在磁盘是否放得下 n 的全部解（解数未知时按放不下处理）。"""
+    size = expected_size(n)
+    if size is None:
+        return False
+    os.makedirs(cache_dir, exist_ok=True)
+    return size <= shutil.disk_usage(cache_dir).free
+
+def stored_count(path, n):
+    return os.path.getsize(path) // (n * solution_dtype(n).itemsize)
+
+def load_solutions(n, path=None):
+    """以只读内存映射方式打开缓存，返回形状为 (解数, n) 的数组；缓存不存在时返回 None。"""
+    path = path or cache_path(n)
+    if not os.path.exists(path):
+        return None
+    count = stored_count(path, n)
+    if count == 0:
+        return np.empty((0, n), dtype=solution_dtype(n))
+    return np.memmap(path, dtype=solution_dtype(n), mode='r', shape=(count, n))
+
+def read_solution(path, n, k):
+    """只读出第 k 个解（从 0 开始），不映射整个文件，适用于仍在写入的文件。"""
+    dtype = solution_dtype(n)
+    return np.fromfile(path, dtype=dtype, count=n, offset=k * n * dtype.itemsize).tolist()
+
+class SolutionWriter:
+    """把解按行追加到 partial_path(n)，commit() 后改名为正式缓存。"""
+
+    def __init__(self, n, cache_dir=CACHE_DIR):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.n = n
+        self.dtype = solution_dtype(n)
+        self.path = partial_path(n, cache_dir)
+        self.final_path = cache_path(n, cache_dir)
+        self.count = 0  # 已写入文件、可以读取的解数
+        self._rows = []
+        self._file = open(self.path, 'wb')
+
+    def append(self, queens):
+        self._rows.append(queens)
+        if len(self._rows) >= FLUSH_ROWS:
+            self.flush()
+
+    def flush(self):
+        if self._rows:
+            np.asarray(self._rows, dtype=self.dtype).tofile(self._file)
+            self.count += len(self._rows)
+            self._rows = []
+        self._file.flush()
+
+    def close(self):
+        """写出缓冲并关闭文件；只 close 不 commit 时结果留在临时文件中，不再需要时调用 discard。"""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def commit(self):
+        self.close()
+        os.replace(self.path, self.final_path)
+        self.path = self.final_path
+
+    def discard(self):
+        """关闭并删除未完成的临时文件（搜索被取消或放弃时）；已 commit 的缓存不受影响。"""
+        self.close()
+        if self.path != self.final_path and os.path.exists(self.path):
+            os.remove(self.path)
+
+def cached_solutions(n, workers=1, cache_dir=CACHE_DIR):
+    """优先读取缓存；没有缓存时搜索一遍并写入，再以内存映射返回。"""
+    solutions = load_solutions(n, cache_path(n, cache_dir))
+    if solutions is None:
+        writer = SolutionWriter(n, cache_dir)
+        for queens in iter_n_queens(n, workers):
+            writer.append(queens)
+        writer.commit()
+        solutions = load_solutions(n, writer.path)
+    return solutions
+
+# ============ 计数索引 ============
+def index_path(n, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"queens_{n}.index.npz")
+
+def save_count_index(n, index, cache_dir=CACHE_DIR):
+    os.makedirs(cache_dir, exist_ok=True)
+    prefixes, counts = index
+    np.savez(index_path(n, cache_dir),
+             prefixes=np.asarray(prefixes, dtype=solution_dtype(n)),
+             counts=np.asarray(counts, dtype=np.int64))
+
+def load_count_index(n, cache_dir=CACHE_DIR):
+    """读取 build_count_index 的结果；不存在时返回 None。"""
+    path = index_path(n, cache_dir)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        return [tuple(p) for p in data['prefixes'].tolist()], data['counts'].tolist()
+
+def cached_count_index(n, workers=1, progress=None, cache_dir=CACHE_DIR):
+    """优先读取已保存的计数索引，否则统计一遍并保存；被取消时返回 None。"""
+    index = load_count_index(n, cache_dir)
+    if index is None:
+        index = build_count_index(n, workers=workers, progress=progress)
+        if index is not None:
+            save_count_index(n, index, cache_dir)
+    return index
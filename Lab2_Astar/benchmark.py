@@ -0,0 +1,191 @@
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+
+import numpy as np
+
+import pathfinding
+from pathfinding import Grid, ExpansionCounter, SEARCHES, UNREACHABLE, dijkstra_distances
+
+# -----------------------
+# 寻路基准测试（不依赖 Tk）
+# -----------------------
+# 在生成的随机 / 迷宫 / 房间地图上跑各个算法，每组 (地图, 尺寸, 算法) 输出一条 JSON 记录：
+#   prepare_ms  预处理用时（JPS+ 距离表、ALT 地标、HPA* 抽象图，其他算法为 0）
+#   wall_ms     全部查询的总用时，mean_ms / max_ms 为单个查询
+#   expansions  扩展的结点总数
+#   peak_kib    单个查询中 tracemalloc 记录到的内存峰值的最大值（另跑一遍测得，不计入用时）
+#   cost        找到的路径代价之和（直 10 / 斜 14），unsolved 为没有找到路径的查询数
+# 同样的参数和种子生成同样的地图与查询，两个版本的输出可以逐条对比。
+MAP_KINDS = ("random", "maze", "rooms")
+DEFAULT_SIZES = (64, 128, 256)
+DEFAULT_ALGORITHMS = ("astar", "dijkstra", "jps", "jps+", "alt", "bi-astar", "bi-dijkstra", "hpa", "wastar")
+RANDOM_DENSITY = 0.3  # 随机地图的障碍比例
+ROOM_SIZE = 16        # 房间地图每个房间的边长（含墙）
+
+# -----------------------
+# 地图生成
+# -----------------------
+def random_map(size, rng, density=RANDOM_DENSITY):
+    return (rng.random((size, size)) < density).astype(np.uint8)
+
+def maze_map(size, rng):
+    """深度优先挖出的完美迷宫：奇数行列的交点是房间，通道宽 1。"""
+    maze = np.ones((size, size), dtype=np.uint8)
+    cells = (size - 1) // 2
+    visited = np.zeros((cells, cells), dtype=bool)
+    stack = [(0, 0)]
+    visited[0, 0] = True
+    maze[1, 1] = 0
+    while stack:
+        cx, cy = stack[-1]
+        options = [(cx + dx, cy + dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                   if 0 <= cx + dx < cells and 0 <= cy + dy < cells and not visited[cx + dx, cy + dy]]
+        if not options:
+            stack.pop()
+            continue
+        nx, ny = options[rng.integers(len(options))]
+        visited[nx, ny] = True
+        maze[cx + nx + 1, cy + ny + 1] = 0  # 打通两个房间之间的墙
+        maze[2 * nx + 1, 2 * ny + 1] = 0
+        stack.append((nx, ny))
+    return maze
+
+def room_map(size, rng, room=ROOM_SIZE):
+    """边长为 room 的房间网格，每段墙上随机开一扇宽 2 的门（斜走不能穿墙角）。"""
+    maze = np.zeros((size, size), dtype=np.uint8)
+    maze[::room, :] = 1
+    maze[:, ::room] = 1
+    for wall in range(room, size, room):
+        for lo in range(0, size, room):
+            hi = min(lo + room, size)
+            if hi - lo < 4:
+                continue
+            door = int(rng.integers(lo + 1, hi - 2))
+            maze[wall, door:door + 2] = 0
+            door = int(rng.integers(lo + 1, hi - 2))
+            maze[door:door + 2, wall] = 0
+    return maze
+
+GENERATORS = {"random": random_map, "maze": maze_map, "rooms": room_map}
+
+def make_queries(maze, count, rng):
+    """在同一个连通区域内随机取 count 对 (起点, 终点)。"""
+    free = np.argwhere(maze == 0)
+    seed = tuple(free[len(free) // 2])
+    reachable = np.argwhere(dijkstra_distances(maze, seed) != UNREACHABLE)
+    picks = rng.integers(len(reachable), size=(count, 2))
+    return [(tuple(map(int, reachable[a])), tuple(map(int, reachable[b]))) for a, b in picks]
+
+# -----------------------
+# 测量
+# -----------------------
+def prepare(maze, algorithm):
+    """建立算法需要的预处理数据，使之后的查询计时不包含它。"""
+    if algorithm == "jps+":
+        pathfinding.jps_cache = (maze, pathfinding.jps_plus_tables(maze))
+    elif algorithm == "alt":
+        pathfinding.use_landmarks(maze, pathfinding.select_landmarks(maze))
+    elif algorithm == "hpa":
+        import hpa
+        hpa.graph_for(maze).prepare()
+
+def run_queries(maze, search, queries, times=None):
+    expansions = cost = unsolved = 0
+    for (sx, sy), (ex, ey) in queries:
+        counter = ExpansionCounter()
+        t0 = time.perf_counter()
+        grid = search(maze, Grid(sx, sy), Grid(ex, ey), counter)
+        if times is not None:
+            times.append(time.perf_counter() - t0)
+        expansions += counter.count
+        if grid is None:
+            unsolved += 1
+        else:
+            cost += grid.g
+    return expansions, cost, unsolved
+
+def peak_memory(maze, search, queries):
+    peak = 0
+    tracemalloc.start()
+    try:
+        for query in queries:
+            tracemalloc.reset_peak()
+            run_queries(maze, search, [query])
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+    finally:
+        tracemalloc.stop()
+    return peak
+
+def benchmark(kinds=MAP_KINDS, sizes=DEFAULT_SIZES, algorithms=DEFAULT_ALGORITHMS,
+              queries=10, seed=0, memory=True, progress=None):
+    """返回结果记录列表；progress(记录) 在每条记录完成后调用。"""
+    results = []
+    for kind in kinds:
+        for size in sizes:
+            rng = np.random.default_rng([seed, size, MAP_KINDS.index(kind)])
+            maze = GENERATORS[kind](size, rng)
+            batch = make_queries(maze, queries, rng)
+            for algorithm in algorithms:
+                search = SEARCHES[algorithm]
+                t0 = time.perf_counter()
+                prepare(maze, algorithm)
+                prepare_ms = (time.perf_counter() - t0) * 1000
+                times = []
+                expansions, cost, unsolved = run_queries(maze, search, batch, times)
+                record = {
+                    "map": kind, "size": size, "algorithm": algorithm, "queries": len(batch),
+                    "prepare_ms": round(prepare_ms, 3),
+                    "wall_ms": round(sum(times) * 1000, 3),
+                    "mean_ms": round(sum(times) * 1000 / max(1, len(times)), 3),
+                    "max_ms": round(max(times, default=0) * 1000, 3),
+                    "expansions": expansions,
+                    "peak_kib": round(peak_memory(maze, search, batch) / 1024, 1) if memory else None,
+                    "cost": cost,
+                    "unsolved": unsolved,
+                }
+                results.append(record)
+                if progress is not None:
+                    progress(record)
+    return results
+
+# -----------------------
+# 命令行
+# -----------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="寻路算法基准测试，结果以 JSON 输出")
+    parser.add_argument("--maps", nargs="+", choices=MAP_KINDS, default=list(MAP_KINDS), help="地图类型")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES), help="地图边长")
+    parser.add_argument("--algorithms", nargs="+", choices=list(SEARCHES), default=list(DEFAULT_ALGORITHMS),
+                        metavar="ALGORITHM", help="要测的算法，可选：" + "、".join(SEARCHES))
+    parser.add_argument("-q", "--queries", type=int, default=10, help="每张地图的查询数")
+    parser.add_argument("--seed", type=int, default=0, help="地图与查询的随机种子")
+    parser.add_argument("--no-memory", action="store_true", help="不测内存峰值（省掉 tracemalloc 那一遍）")
+    parser.add_argument("-o", "--output", default=None, help="JSON 输出文件，默认打印到标准输出")
+    args = parser.parse_args(argv)
+
+    def progress(record):
+        print(f"{record['map']:>6} {record['size']:>5} {record['algorithm']:<12} "
+              f"{record['wall_ms']:>10.1f} ms {record['expansions']:>10} 次扩展", file=sys.stderr)
+
+    results = benchmark(args.maps, args.sizes, args.algorithms, args.queries, args.seed,
+                        not args.no_memory, progress)
+    report = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    sys.exit(main())
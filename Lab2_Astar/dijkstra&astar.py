@@ -1,485 +1,570 @@
+import time
+import numpy as np
 import tkinter as tk
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
 from matplotlib.patches import Rectangle
+from matplotlib.colors import ListedColormap
 from PIL import Image, ImageTk
 
-openc = []
+from maze_io import as_grid, load_maze, cached_landmarks
+import pathfinding
+from pathfinding import Grid, StepLog
+from incremental import DStarLite
+import hpa
+
+# 没有指定地图文件时使用的默认迷宫（0 可走，1 障碍）
+DEFAULT_MAZE = as_grid([
+    [0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    [0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    [0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    [0, 0, 0, 0, 0, 1, 0, 0, 0, 0],
+    [0, 0, 0, 0, 0, 1, 0, 0, 0, 0],
+    [0, 0, 0, 0, 0, 1, 0, 0, 0, 0],
+    [0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    [0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    [0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+])
+
+step_log = None   # 最近一次搜索的事件日志
+final_path = []   # 最近一次搜索的路径（Grid 列表，终点在前）
 
-# 可视化
-def draw_node_ax(maze, ax):
-    """使用填充矩形在给定的坐标轴 `ax` 上绘制障碍物。
-        保持与原始代码相同的视觉映射（左上角为网格原点）。"""
-    for i in range(len(maze)):
-        for j in range(len(maze[0])):
-            if maze[i][j] == 1:
-                ax.add_patch(Rectangle((j, n-1-i), 1, 1, facecolor=(0.85, 0.2, 0.2), edgecolor='k', alpha=0.9))
-
-def make_frame(step_index, start, end, next_list, already_list, now_grid=None, annotate_all=True):
-    """为当前的 A* / Dijkstra 步骤创建一个 matplotlib 图形并返回它（不显示）。"""
-    global m, n, MAZE
-    fig = plt.figure(step_index, figsize=(6, 6 * (n / max(1, m))))
-    ax = fig.add_subplot(111)
-
-    # grid and axis settings
+# -----------------------
+# 可视化：整张迷宫画成一张栅格图
+# -----------------------
+# 障碍 / open / closed / 路径都编码进一个 uint8 数组，用一次 imshow 画出；
+# 逐步播放时只改动这一步涉及的格子，再把图像、当前结点和标题 blit 到缓存的背景上，
+# 不再每个格子一个 patch / scatter / text。f、g、h 数字只在视野内格子不多时标出
+# （小地图，或用滚轮放大后）。坐标映射与原来相同：格子 (x, y) 占 [y, y+1] x [n-1-x, n-x]。
+RASTER_COLORS = ['white', (0.85, 0.2, 0.2),          # 空地、障碍
+                 'lightsteelblue', 'navajowhite',     # closed：正向 / 反向
+                 'blue', 'orange',                    # open：正向 / 反向
+                 'limegreen']                         # 最终路径
+FREE_CODE, WALL_CODE, CLOSED_CODE, OPEN_CODE, PATH_CODE = 0, 1, 2, 4, 6
+RASTER_CMAP = ListedColormap(RASTER_COLORS)
+RASTER_RANK = np.array([0, 6, 4, 3, 2, 1, 5])  # 各颜色的覆盖优先级：路径 > closed > open > 空地
+ANNOTATE_CELLS = 400   # 视野内格子数不超过该值时标出 f / g / h
+GRID_LINES_MAX = 50    # 边长不超过该值时画网格线并逐格标刻度
+ZOOM_STEP = 1.25       # 滚轮每格的缩放倍数
+
+view_fig = None         # 复用的显示图形，每次 Run 按迷宫尺寸重建
+view_canvas = None
+view_window = None
+view_artists = {}       # blit 时重画的动画元素：image / current / path / title
+view_background = None  # 不含动画元素的整张图，每次完整重绘后更新
+view_texts = []         # 当前帧的 f / g / h 文字
+base_raster = None      # 只有障碍的栅格
+view_raster = None      # 当前显示的栅格
+raster_step = None      # view_raster 对应的步数，None 表示需要重建
+shown_step = None       # 当前画在 view_canvas 上的步数
+
+def reset_raster():
+    """迷宫或日志变了以后调用：按 MAZE 重建障碍栅格，下一帧整体重画。"""
+    global base_raster, view_raster, raster_step
+    base_raster = np.where(MAZE, WALL_CODE, FREE_CODE).astype(np.uint8)
+    view_raster = base_raster.copy()
+    raster_step = None
+
+def paint(cells, code):
+    # cells 为格子编号（反向一侧为 ~编号），反向一侧用 code + 1。
+    # 双向搜索时一个格子可能同时属于两侧，只让优先级高的颜色覆盖低的，
+    # 这样逐步更新和整体重建的结果与事件的先后无关
+    cells = np.fromiter(cells, dtype=np.int64)
+    flat = view_raster.reshape(-1)
+    for targets, color in ((cells[cells >= 0], code), (~cells[cells < 0], code + 1)):
+        if not len(targets):
+            continue
+        targets = targets[RASTER_RANK[flat[targets]] < RASTER_RANK[color]]
+        flat[targets] = color
+
+def update_raster(k):
+    """让 view_raster 显示第 k 步；从上一步前进一步时只改这一步涉及的格子。"""
+    global raster_step
+    if raster_step is not None and k == raster_step + 1:
+        cell, updates = step_log.steps[raster_step]
+        paint([cell], CLOSED_CODE)
+        paint([v for v, _, _ in updates], OPEN_CODE)
+    else:
+        opened, closed = step_log.state(min(k, len(step_log)))
+        view_raster[...] = base_raster
+        paint(closed, CLOSED_CODE)
+        paint(opened, OPEN_CODE)
+    if k >= len(step_log):
+        paint([p.x * m + p.y for p in final_path], PATH_CODE)
+    raster_step = k
+
+def setup_view():
+    """建立坐标轴上的静态部分（网格、起点终点）和动画元素，然后完整重绘一次。"""
+    global view_artists
+    ax = view_fig.axes[0]
+    ax.cla()
     ax.set_xlim(0, m)
     ax.set_ylim(0, n)
-    ax.set_xticks(range(m + 1))
-    ax.set_yticks(range(n + 1))
-    ax.grid(True, linestyle='--', linewidth=0.6, color='gray', alpha=0.5)
     ax.set_aspect('equal')
+    if max(n, m) <= GRID_LINES_MAX:
+        ax.set_xticks(range(m + 1))
+        ax.set_yticks(range(n + 1))
+        ax.grid(True, linestyle='--', linewidth=0.6, color='gray', alpha=0.5)
+    image = ax.imshow(view_raster, cmap=RASTER_CMAP, vmin=0, vmax=len(RASTER_COLORS) - 1,
+                      extent=(0, m, 0, n), interpolation='nearest', zorder=0, animated=True)
+    current = Rectangle((0, 0), 1, 1, fill=False, edgecolor='k', linewidth=2, zorder=7,
+                        animated=True, visible=False)
+    ax.add_patch(current)
+    path_line, = ax.plot([], [], linewidth=3, linestyle='-', color='tab:green', zorder=9, animated=True)
+
+    # 起点、终点标记不随步数变化，画在背景里；标记大小随格子大小缩放
+    marker = min(300, (0.9 * 6 * 72 / max(n, m)) ** 2)
+    ax.scatter(start_grid.y + 0.5, n - 0.5 - start_grid.x, s=marker, marker='X', color='lime', edgecolor='k', zorder=8)
+    ax.scatter(end_grid.y + 0.5, n - 0.5 - end_grid.x, s=marker, marker='X', color='magenta', edgecolor='k', zorder=8)
+    if n * m <= ANNOTATE_CELLS:
+        ax.text(start_grid.y + 0.1, n - start_grid.x, 'START', fontsize=9, weight='bold', zorder=9)
+        ax.text(end_grid.y + 0.2, n - end_grid.x, 'END', fontsize=9, weight='bold', zorder=9)
+    title = ax.set_title('', fontsize=11, animated=True)
+    view_artists = {'image': image, 'current': current, 'path': path_line, 'title': title}
+    view_canvas.draw()
+    on_draw(None)
+
+def on_draw(event):
+    # 完整重绘（第一次显示、缩放、窗口大小变化）后重新缓存背景，再把当前帧 blit 上去
+    global view_background
+    view_background = view_canvas.copy_from_bbox(view_fig.bbox)
+    if shown_step is not None:
+        blit_frame(shown_step)
+
+def visible_cells(ax):
+    (x0, x1), (y0, y1) = ax.get_xlim(), ax.get_ylim()
+    return abs(x1 - x0) * abs(y1 - y0)
+
+def annotate(ax, k):
+    """视野内格子不多时给 open / closed 中可见的格子标出 f、g、h（文字也是动画元素）。"""
+    for text in view_texts:
+        text.remove()
+    view_texts.clear()
+    if visible_cells(ax) > ANNOTATE_CELLS:
+        return
+    (x0, x1), (y0, y1) = sorted(ax.get_xlim()), sorted(ax.get_ylim())
+    fontsize = min(12, 6 * 72 / (x1 - x0) / 3.5)
+    opened, closed = step_log.state(min(k, len(step_log)))
+    for nodes in (closed, opened):
+        for cell, (g, h) in nodes.items():
+            x, y = divmod(cell if cell >= 0 else ~cell, m)
+            if not (x0 - 1 <= y <= x1 and y0 - 1 <= n - 1 - x <= y1):
+                continue
+            for dx, dy, value, color, ha, va in ((1, n - 0.5 - x, g + h, 'red', 'right', 'top'),
+                                                 (0, n - x, g, 'green', 'left', 'top'),
+                                                 (0, n - 1 - x, h, 'blue', 'left', 'bottom')):
+                view_texts.append(ax.text(y + dx, dy, value, fontsize=fontsize, color=color,
+                                          ha=ha, va=va, zorder=6, animated=True, clip_on=True))
+
+def blit_frame(k):
+    """把第 k 步画到缓存的背景上；k 等于总步数时显示最终路径。"""
+    ax = view_fig.axes[0]
+    view_canvas.restore_region(view_background)
+    image, current, path_line, title = (view_artists[key] for key in ('image', 'current', 'path', 'title'))
+    image.set_data(view_raster)
+    ax.draw_artist(image)
+    if k < len(step_log):
+        cell = step_log.steps[k][0]
+        x, y = divmod(cell if cell >= 0 else ~cell, m)
+        current.set_xy((y, n - 1 - x))
+        current.set_visible(True)
+        ax.draw_artist(current)
+        title.set_text(f'{algorithm_label.get()} step: {k}')
+    else:
+        current.set_visible(False)
+        path_line.set_data([p.y + 0.5 for p in final_path], [n - 0.5 - p.x for p in final_path])
+        ax.draw_artist(path_line)
+        title.set_text(status_text)
+    annotate(ax, k)
+    for text in view_texts:
+        ax.draw_artist(text)
+    ax.draw_artist(title)
+    view_canvas.blit(view_fig.bbox)
+
+def on_scroll(event):
+    """滚轮以鼠标位置为中心缩放，放大到格子足够少时显示 f / g / h。"""
+    if event.inaxes is None or event.xdata is None:
+        return
+    ax = event.inaxes
+    scale = 1 / ZOOM_STEP if event.button == 'up' else ZOOM_STEP
+    (x0, x1), (y0, y1) = ax.get_xlim(), ax.get_ylim()
+    width = min(m, max(2, (x1 - x0) * scale))
+    height = min(n, max(2, (y1 - y0) * scale))
+    cx = min(max(event.xdata, width / 2), m - width / 2)
+    cy = min(max(event.ydata, height / 2), n - height / 2)
+    ax.set_xlim(cx - width / 2, cx + width / 2)
+    ax.set_ylim(cy - height / 2, cy + height / 2)
+    view_canvas.draw_idle()
 
-    # draw obstacles
-    draw_node_ax(MAZE, ax)
-
-    # draw next_list (open set)
-    for node in next_list:
-        ax.scatter(node.y + 0.5, n - 0.5 - node.x, s=200, color='blue', zorder=5)
-        if annotate_all:
-            ax.text(node.y + 1, n - 0.5 - node.x, node.f, fontsize=12, color='red', ha='right', va='top', zorder=6)
-            ax.text(node.y, n - node.x, node.g, fontsize=12, color='green', ha='left', va='top', zorder=6)
-            ax.text(node.y, n - 1 - node.x, node.h, fontsize=12, color='blue', ha='left', va='bottom', zorder=6)
-
-    # draw already_list (closed set) as dots
-    for node in already_list:
-        ax.scatter(node.y + 0.5, n - 0.5 - node.x, s=200, color='blue', alpha=0.9, zorder=4)
-        if annotate_all:
-            ax.text(node.y + 1, n - 0.5 - node.x, node.f, fontsize=12, color='red', ha='right', va='top', zorder=6)
-            ax.text(node.y, n - node.x, node.g, fontsize=12, color='green', ha='left', va='top', zorder=6)
-            ax.text(node.y, n - 1 - node.x, node.h, fontsize=12, color='blue', ha='left', va='bottom', zorder=6)
-
-    # draw current node with distinct marker
-    if now_grid is not None:
-        ax.scatter(now_grid.y + 0.5, n - 0.5 - now_grid.x, s=260, marker='o', color='blue', edgecolor='k', zorder=7)
-
-    # draw start and end with clear markers and f/g/h as before
-    ax.text(start.y + 1, n - 0.5 - start.x, start.f, fontsize=12, color='red', ha='right', va='top')
-    ax.text(start.y, n - start.x, start.g, fontsize=12, color='green', ha='left', va='top')
-    ax.text(start.y, n - 1 - start.x, start.h, fontsize=12, color='blue', ha='left', va='bottom')
-
-    ax.text(end.y + 1, n - 0.5 - end.x, end.f, fontsize=12, color='red', ha='right', va='top')
-    ax.text(end.y, n - end.x, end.g, fontsize=12, color='green', ha='left', va='top')
-    ax.text(end.y, n - 1 - end.x, end.h, fontsize=12, color='blue', ha='left', va='bottom')
-
-    ax.scatter(start.y + 0.5, n - 0.5 - start.x, s=300, marker='X', color='lime', edgecolor='k', zorder=8)
-    ax.text(start.y + 0.1 , n  - start.x, 'START', fontsize=9, weight='bold', zorder=9)
-
-    ax.scatter(end.y + 0.5, n - 0.5 - end.x, s=300, marker='X', color='magenta', edgecolor='k', zorder=8)
-    ax.text(end.y + 0.2, n  - end.x, 'END', fontsize=9, weight='bold', zorder=9)
-
-    ax.set_title(f'{algorithm_label.get()} step: {step_index}', fontsize=11)
-
-    return fig
-
-# find_neighbors: now supports turning off heuristic (for Dijkstra)
-def find_neighbors(grid, next_list, already_list, use_heuristic=True, end=None):
-    grid_list = []
-    # 判断八个方向是否满足要求，满足便添加
-    if is_valid_grid(grid.x, grid.y-1, next_list, already_list):
-        grid_list.append(Grid(grid.x, grid.y-1))
-    if is_valid_grid(grid.x, grid.y+1, next_list, already_list):
-        grid_list.append(Grid(grid.x, grid.y+1))
-    if is_valid_grid(grid.x-1, grid.y, next_list, already_list):
-        grid_list.append(Grid(grid.x-1, grid.y))
-    if is_valid_grid(grid.x+1, grid.y, next_list, already_list):
-        grid_list.append(Grid(grid.x+1, grid.y))
-
-    if is_valid_grid(grid.x+1, grid.y+1, next_list, already_list):
-        grid_list.append(Grid(grid.x+1, grid.y+1))
-    if is_valid_grid(grid.x-1, grid.y-1, next_list, already_list):
-        grid_list.append(Grid(grid.x-1, grid.y-1))
-    if is_valid_grid(grid.x-1, grid.y+1, next_list, already_list):
-        grid_list.append(Grid(grid.x-1, grid.y+1))
-    if is_valid_grid(grid.x+1, grid.y-1, next_list, already_list):
-        grid_list.append(Grid(grid.x+1, grid.y-1))
-
-    # 更新已存在节点的 g 值（直/斜分别 +10 / +14）
-    index1= [(-1,0),(1,0),(0,-1),(0,1)]
-    for dx,dy in index1:
-        tx, ty = grid.x+dx, grid.y+dy
-        if contain_grid(next_list, tx, ty):
-            for search in next_list:
-                if search.x == tx and search.y == ty:
-                    old_g = search.g
-                    old_grid = search
-                    break
-            now_g = grid.g + 10
-            if now_g < old_g:
-                Grid_now = Grid(tx, ty)
-                # 使用传入的 end（若为 None 则用全局 end_grid）
-                Grid_now.init_grid(grid, end if end is not None else end_grid)
-                if not use_heuristic:
-                    Grid_now.h = 0
-                    Grid_now.f = Grid_now.g
-                next_list.remove(old_grid)
-                next_list.append(Grid_now)
-
-        if contain_grid(already_list, tx, ty):
-            for search in already_list:
-                if search.x == tx and search.y == ty:
-                    old_g = search.g
-                    old_grid = search
-                    break
-            now_g = grid.g + 10
-            if now_g < old_g:
-                Grid_now = Grid(tx, ty)
-                Grid_now.init_grid(grid, end if end is not None else end_grid)
-                if not use_heuristic:
-                    Grid_now.h = 0
-                    Grid_now.f = Grid_now.g
-                already_list.remove(old_grid)
-                next_list.append(Grid_now)
-
-    index2 = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-    for dx,dy in index2:
-        tx, ty = grid.x+dx, grid.y+dy
-        if contain_grid(next_list, tx, ty):
-            for search in next_list:
-                if search.x == tx and search.y == ty:
-                    old_g = search.g
-                    old_grid = search
-                    break
-            now_g = grid.g + 14
-            if now_g < old_g:
-                Grid_now = Grid(tx, ty)
-                Grid_now.init_grid(grid, end if end is not None else end_grid)
-                if not use_heuristic:
-                    Grid_now.h = 0
-                    Grid_now.f = Grid_now.g
-                next_list.remove(old_grid)
-                next_list.append(Grid_now)
-
-        if contain_grid(already_list, tx, ty):
-            for search in already_list:
-                if search.x == tx and search.y == ty:
-                    old_g = search.g
-                    old_grid = search
-                    break
-            now_g = grid.g + 14
-            if now_g < old_g:
-                Grid_now = Grid(tx, ty)
-                Grid_now.init_grid(grid, end if end is not None else end_grid)
-                if not use_heuristic:
-                    Grid_now.h = 0
-                    Grid_now.f = Grid_now.g
-                already_list.remove(old_grid)
-                next_list.append(Grid_now)
-
-    return grid_list
-
-def is_valid_grid(x, y, next_list, already_list):
-    # 边界
-    if x<0 or x>=len(MAZE) or y<0 or y>=len(MAZE[0]):
-        return False
-    # 障碍
-    if MAZE[x][y] == 1:
-        return False
-    # 是否在next和already中
-    if contain_grid(next_list, x,y):
-        return False
-    if contain_grid(already_list, x,y):
-        return False
-    return True
-
-def contain_grid(grid_list, x,y):
-    for grid in grid_list:
-        if (grid.x == x) and (grid.y == y):
-            return True
-    return False
-
-def find_min_grid(next_list=[]):
-    # 选择 f 最小的；在 Dijkstra 情况下 f==g
-    temp_grid = next_list[0]
-    for grid in next_list:
-        if grid.f < temp_grid.f:
-            temp_grid = grid
-    return temp_grid
-
-class Grid:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.f = 0
-        self.g = 0
-        self.h = 0
-        self.parent = None
-    def init_grid(self, parent, end):
-        self.parent = parent
-        if abs(self.x - parent.x) + abs(self.y - parent.y) == 2:
-            self.g = parent.g + 14
-        else:
-            self.g = parent.g + 10
-        # end 可能为 None（在特定调用路径），处理稳健性
-        if end is not None:
-            self.h = (abs(self.x - end.x) + abs(self.y - end.y))*10
-        else:
-            self.h = 0
-        self.f = self.g + self.h
-
-def draw_picture(m_arg, n_arg, path):
-    global MAZE
-    global success
-    success = plt.figure(3000, figsize=(6, 6 * (n_arg / max(1, m_arg))))
-    ax = success.add_subplot(111)
-
-    ax.set_xlim(0,m_arg)
-    ax.set_ylim(0,n_arg)
-    ax.set_xticks(range(m_arg+1))
-    ax.set_yticks(range(n_arg+1))
-    ax.grid(True, linestyle='--', linewidth=0.6, color='gray', alpha=0.5)
-    ax.set_aspect('equal')
+# -----------------------
+# A* 搜索（使用启发式 h）
+# -----------------------
+def a_start_search(start, end, log=None):
+    return pathfinding.astar_search(MAZE, start, end, log=log)
 
-    # Draw path as a connected line + nodes (use original coordinate mapping)
-    ys = [p.y + 0.5 for p in path]
-    xs = [n_arg - 0.5 - p.x for p in path]
-    if len(xs) > 0:
-        ax.plot(ys[::-1], xs[::-1], linewidth=3, linestyle='-', zorder=9)
-    for i in range(len(path)):
-        ax.scatter(path[i].y+0.5, n_arg-0.5-path[i].x, s=240, color='tab:blue', edgecolor='k', zorder=10)
+# -----------------------
+# Dijkstra 搜索（h = 0）
+# -----------------------
+def dijkstra_search(start, end, log=None):
+    return pathfinding.dijkstra_search(MAZE, start, end, log=log)
 
-    draw_node_ax(MAZE, ax)
+# -----------------------
+# Jump Point Search（JPS / JPS+，见 pathfinding.py）
+# -----------------------
+def jps_search(start, end, log=None):
+    return pathfinding.jps_search(MAZE, start, end, log=log)
+
+def jps_plus_search(start, end, log=None):
+    return pathfinding.jps_plus_search(MAZE, start, end, log=log)
 
 # -----------------------
-# A* 搜索（使用启发式 h）
+# 双向 A* / Dijkstra
+# -----------------------
+def bi_astar_search(start, end, log=None):
+    return pathfinding.bidirectional_astar_search(MAZE, start, end, log=log)
+
+def bi_dijkstra_search(start, end, log=None):
+    return pathfinding.bidirectional_dijkstra_search(MAZE, start, end, log=log)
+
 # -----------------------
-def a_start_search(start, end):
-    global m, n, MAZE, openc
-    openc = []
-    next_list = []
-    already_list = []
-
-    # 初始化 start（在放入 next 之前）
-    start.g = 0
-    start.h = (abs(start.x-end.x) + abs(start.y-end.y))*10
-    start.f = start.g + start.h
-    next_list.append(start)
-
-    step = 0
-    while len(next_list) > 0:
-        fig = make_frame(step, start, end, next_list, already_list)
-        openc.append(fig)
-        step += 1
-
-        # 寻找最小 f 节点
-        now_grid = find_min_grid(next_list)
-        next_list.remove(now_grid)
-        already_list.append(now_grid)
-
-        # 寻找邻居（启发式开启）
-        neighbors = find_neighbors(now_grid, next_list, already_list, use_heuristic=True, end=end)
-        for grid in neighbors:
-            # 斜角穿越判断（保留原逻辑）
-            success11 = 0
-            if 0 <= grid.x-1 < len(MAZE) and 0 <= now_grid.y + 1 < len(MAZE[0]):
-                if MAZE[grid.x - 1][grid.y] == 1 and MAZE[now_grid.x][now_grid.y + 1] == 1:
-                    success11 = 101
-            if 0 <= grid.x+1 < len(MAZE) and 0 <= now_grid.y + 1 < len(MAZE[0]):
-                if MAZE[grid.x + 1][grid.y] == 1 and MAZE[now_grid.x][now_grid.y + 1] == 1:
-                    success11 = 101
-            if 0 <= grid.y-1 < len(MAZE[0]) and 0 <= now_grid.x + 1 < len(MAZE):
-                if MAZE[grid.x][grid.y-1] == 1 and MAZE[now_grid.x+1][now_grid.y] == 1:
-                    success11 = 101
-            if 0 <= grid.y-1 < len(MAZE[0]) and 0 <= now_grid.x - 1 < len(MAZE):
-                if MAZE[grid.x][grid.y-1] == 1 and MAZE[now_grid.x-1][now_grid.y] == 1:
-                    success11 = 101
-
-            if success11 != 101:
-                grid.init_grid(now_grid, end)
-                next_list.append(grid)
-
-        # 检查是否到达终点
-        for grid in next_list:
-            if (grid.x == end.x) and (grid.y == end.y):
-                return grid
-
-    return None
+# ALT 地标启发式（地图文件的距离表保存在地图旁边）
+# -----------------------
+def alt_search(start, end, log=None):
+    # 磁盘上的距离表只对应未修改的地图，点击改动后由 pathfinding.alt_search 重新计算
+    if pathfinding.alt_cache[0] is not MAZE and loaded_map[0] and MAZE is loaded_map[1]:
+        pathfinding.use_landmarks(MAZE, cached_landmarks(loaded_map[0], MAZE))
+    return pathfinding.alt_search(MAZE, start, end, log=log)
 
 # -----------------------
-# Dijkstra 搜索（h = 0）
+# HPA*（见 hpa.py）：抽象图随迷宫缓存，点击修改障碍时只重建所在的簇
+# -----------------------
+def hpa_search(start, end, log=None):
+    return hpa.hpa_search(MAZE, start, end, log=log)
+
+# -----------------------
+# 加权 A* / ARA*：权重与时间预算取自输入框，次优界显示在最终路径的标题上
 # -----------------------
-def dijkstra_search(start, end):
-    global m, n, MAZE, openc
-    openc = []
-    next_list = []
-    already_list = []
-
-    # 初始化 start（h = 0）
-    start.g = 0
-    start.h = 0
-    start.f = start.g
-    next_list.append(start)
-
-    step = 0
-    while len(next_list) > 0:
-        fig = make_frame(step, start, end, next_list, already_list)
-        openc.append(fig)
-        step += 1
-
-        # 寻找最小 f（f==g）
-        now_grid = find_min_grid(next_list)
-        next_list.remove(now_grid)
-        already_list.append(now_grid)
-
-        # 寻找邻居（不使用启发式）
-        neighbors = find_neighbors(now_grid, next_list, already_list, use_heuristic=False, end=end)
-        for grid in neighbors:
-            # 斜角穿越判断（保留原逻辑）
-            success11 = 0
-            if 0 <= grid.x-1 < len(MAZE) and 0 <= now_grid.y + 1 < len(MAZE[0]):
-                if MAZE[grid.x - 1][grid.y] == 1 and MAZE[now_grid.x][now_grid.y + 1] == 1:
-                    success11 = 101
-            if 0 <= grid.x+1 < len(MAZE) and 0 <= now_grid.y + 1 < len(MAZE[0]):
-                if MAZE[grid.x + 1][grid.y] == 1 and MAZE[now_grid.x][now_grid.y + 1] == 1:
-                    success11 = 101
-            if 0 <= grid.y-1 < len(MAZE[0]) and 0 <= now_grid.x + 1 < len(MAZE):
-                if MAZE[grid.x][grid.y-1] == 1 and MAZE[now_grid.x+1][now_grid.y] == 1:
-                    success11 = 101
-            if 0 <= grid.y-1 < len(MAZE[0]) and 0 <= now_grid.x - 1 < len(MAZE):
-                if MAZE[grid.x][grid.y-1] == 1 and MAZE[now_grid.x-1][now_grid.y] == 1:
-                    success11 = 101
-
-            if success11 != 101:
-                grid.init_grid(now_grid, end)
-                # Dijkstra: 丢弃启发式 h，f==g
-                grid.h = 0
-                grid.f = grid.g
-                next_list.append(grid)
-
-        # 检查是否到达终点
-        for grid in next_list:
-            if (grid.x == end.x) and (grid.y == end.y):
-                return grid
-
-    return None
+search_note = ''   # 搜索函数给出的附加说明，run_search 拼到 status_text 后面
+
+def entry_number(entry):
+    value = float(entry.get())
+    return int(value) if value.is_integer() else value
+
+def weighted_astar_search(start, end, log=None):
+    global search_note
+    weight = entry_number(e6)
+    search_note = f'bound {weight}'
+    return pathfinding.weighted_astar_search(MAZE, start, end, log=log, weight=weight)
+
+def ara_search(start, end, log=None):
+    global search_note
+    result, bound, improvements = None, None, 0
+    for result, bound in pathfinding.anytime_paths(MAZE, start, end, entry_number(e7), log=log):
+        improvements += 1
+    if result is None:
+        search_note = 'no path within deadline'
+    else:
+        search_note = f'bound {bound:.2f}, {improvements} solutions'
+    return result
+
+# -----------------------
+# D* Lite（见 incremental.py）：点击格子增减障碍后只修复受影响的部分
+# -----------------------
+planner = None     # 当前的 DStarLite，换算法或重新 Run 时丢弃
+status_text = ''   # 画最终路径时显示在标题上的说明
+
+def dstar_search(start, end, log=None):
+    global MAZE, planner
+    MAZE = editable_maze()
+    planner = DStarLite(MAZE, (start.x, start.y), (end.x, end.y))
+    return pathfinding.cells_to_grid(planner.path() or [])
 
 # -------------------------
 # Tkinter UI (with background)
 # -------------------------
-root = tk.Tk()
-root.title("A* vs Dijkstra")
-root.geometry('1000x700')
-
-# 全局选择标签（显示当前算法）
-algorithm_label = tk.StringVar(value="A*")  # 默认 A*
-algorithm_choice = {"A*": "astar", "Dijkstra": "dijkstra"}
-
-# 背景图（background.png）
-try:
-    bg_image = Image.open("background.png")
-    bg_image = bg_image.resize((1000, 700))
-    bg_photo = ImageTk.PhotoImage(bg_image)
-    bg_canvas = tk.Canvas(root, width=1000, height=600)
-    bg_canvas.pack(fill="both", expand=True)
-    bg_canvas.create_image(0, 0, image=bg_photo, anchor="nw")
-except Exception:
-    # 若没有背景图则使用普通 frame
-    bg_canvas = tk.Canvas(root, width=1000, height=600, bg="#f0f0f0")
-    bg_canvas.pack(fill="both", expand=True)
-
-# 显示当前算法
-alg_label_widget = tk.Label(root, textvariable=algorithm_label, bg="#ffffff", font=("Arial", 10, "bold"))
-bg_canvas.create_window(200, 30, window=alg_label_widget)
+algorithm_choice = {"A*": "astar", "Dijkstra": "dijkstra", "JPS": "jps", "JPS+": "jps+", "ALT": "alt",
+                    "Bi-A*": "bi-astar", "Bi-Dijkstra": "bi-dijkstra", "D* Lite": "dstar",
+                    "HPA*": "hpa", "Weighted A*": "wastar", "ARA*": "ara"}
+search_functions = {"astar": a_start_search, "dijkstra": dijkstra_search,
+                    "jps": jps_search, "jps+": jps_plus_search, "alt": alt_search,
+                    "bi-astar": bi_astar_search, "bi-dijkstra": bi_dijkstra_search,
+                    "dstar": dstar_search, "hpa": hpa_search,
+                    "wastar": weighted_astar_search, "ara": ara_search}
 
 # 算法选择按钮
 def select_astar():
     algorithm_label.set("A*")
 def select_dijkstra():
     algorithm_label.set("Dijkstra")
-
-btn_astar = tk.Button(root, text="选择 A*", command=select_astar, width=12)
-bg_canvas.create_window(120, 60, window=btn_astar)
-btn_dijkstra = tk.Button(root, text="选择 Dijkstra", command=select_dijkstra, width=12)
-bg_canvas.create_window(260, 60, window=btn_dijkstra)
-
-# 输入与控件（放在 canvas 上）
-label= tk.Label(root, text="起点的x坐标", bg="#ffffff")
-bg_canvas.create_window(80, 110, window=label)
-e = tk.Entry(root, show=None, width=10)
-e.insert(0, "1")
-bg_canvas.create_window(80, 135, window=e)
-
-label2= tk.Label(root, text="起点的y坐标", bg="#ffffff")
-bg_canvas.create_window(80, 170, window=label2)
-e2 = tk.Entry(root, show=None, width=10)
-e2.insert(0, "1")
-bg_canvas.create_window(80, 195, window=e2)
-
-label3= tk.Label(root, text="终点的x坐标", bg="#ffffff")
-bg_canvas.create_window(80, 230, window=label3)
-e3 = tk.Entry(root, show=None, width=10)
-e3.insert(0, "7")
-bg_canvas.create_window(80, 255, window=e3)
-
-label4= tk.Label(root, text="终点的y坐标", bg="#ffffff")
-bg_canvas.create_window(80, 290, window=label4)
-e4 = tk.Entry(root, show=None, width=10)
-e4.insert(0, "7")
-bg_canvas.create_window(80, 315, window=e4)
+def select_jps():
+    algorithm_label.set("JPS")
+def select_jps_plus():
+    algorithm_label.set("JPS+")
+def select_alt():
+    algorithm_label.set("ALT")
+def select_bi_astar():
+    algorithm_label.set("Bi-A*")
+def select_bi_dijkstra():
+    algorithm_label.set("Bi-Dijkstra")
+def select_dstar():
+    algorithm_label.set("D* Lite")
+def select_hpa():
+    algorithm_label.set("HPA*")
+def select_weighted_astar():
+    algorithm_label.set("Weighted A*")
+def select_ara():
+    algorithm_label.set("ARA*")
 
 # Run / Next 控件
+loaded_map = (None, DEFAULT_MAZE)  # (文件路径, 迷宫)，同一个文件只读一次
+
+def load_map_entry():
+    """按输入框中的路径读取迷宫，留空时使用 DEFAULT_MAZE。"""
+    global loaded_map
+    path = e5.get().strip() or None
+    if path != loaded_map[0]:
+        loaded_map = (path, load_maze(path, mmap=True) if path else DEFAULT_MAZE)
+    return loaded_map[1]
+
+def editable_maze():
+    # 点击修改障碍前先复制一份，不改动 DEFAULT_MAZE 或只读映射的地图
+    if MAZE is loaded_map[1] or not MAZE.flags.writeable:
+        return np.array(MAZE)
+    return MAZE
+
+def forget_tables(keep_hpa=False):
+    # 点击是原地修改 MAZE，JPS+ / ALT / HPA* 的缓存却按迷宫对象判断是否有效，改动后一律作废；
+    # HPA* 模式下抽象图已由 set_cell 局部更新，可以保留
+    pathfinding.jps_cache = (None, None)
+    pathfinding.alt_cache = (None, None)
+    if not keep_hpa:
+        hpa.graph_cache = (None, None)
+
+def show_step(k):
+    """只在需要时从 step_log 重放并画出第 k 步；k 等于总步数时画最终路径。"""
+    global shown_step
+    if step_log is None or k == shown_step:
+        return
+    update_raster(k)
+    blit_frame(k)
+    shown_step = k
+
+def on_scale(value):
+    # Next 按钮调用 step_scale.set 时也会触发本回调，此时该步已经画好，不改 count
+    global count
+    k = int(float(value))
+    if k != shown_step:
+        count = k
+        show_step(k)
+
+def run_search():
+    """用当前选择的算法在 MAZE 上搜索，只记录事件日志，不生成图形。"""
+    global step_log, final_path, planner, status_text, search_note
+    planner = None
+    search_note = ''
+    log = StepLog()
+    search = search_functions[algorithm_choice[algorithm_label.get()]]
+    t0 = time.perf_counter()
+    result_grid = search(start_grid, end_grid, log=log)
+    status_text = f'{algorithm_label.get()}: {(time.perf_counter() - t0) * 1000:.1f} ms'
+    if search_note:
+        status_text += f', {search_note}'
+
+    # 路径回溯
+    path = []
+    while result_grid is not None:
+        path.append(Grid(result_grid.x, result_grid.y))
+        result_grid = result_grid.parent
+    step_log = log
+    final_path = path
+    reset_raster()
+
+def on_click(event):
+    """点击格子切换障碍：D* Lite 增量修复路径，其他算法在改动后的迷宫上重新搜索。"""
+    global MAZE, final_path, status_text
+    if step_log is None or event.inaxes is None or event.xdata is None:
+        return
+    x, y = n - 1 - int(event.ydata), int(event.xdata)
+    if not (0 <= x < n and 0 <= y < m) or (x, y) in ((start_grid.x, start_grid.y), (end_grid.x, end_grid.y)):
+        return
+    if planner is not None:
+        before = planner.expansions
+        t0 = time.perf_counter()
+        planner.set_cell(x, y, not MAZE[x, y])
+        forget_tables()
+        final_path = [Grid(cx, cy) for cx, cy in reversed(planner.path() or [])]
+        status_text = (f'D* Lite: repaired in {(time.perf_counter() - t0) * 1000:.1f} ms, '
+                       f'{planner.expansions - before} expansions')
+    else:
+        MAZE = editable_maze()
+        if algorithm_choice[algorithm_label.get()] == "hpa":
+            hpa.graph_for(MAZE).set_cell(x, y, not MAZE[x, y])
+            forget_tables(keep_hpa=True)
+        else:
+            MAZE[x, y] ^= 1
+            forget_tables()
+        run_search()
+    show_final()
+
+def show_final():
+    # 改动迷宫后直接显示最终路径，滑块移到最右端
+    global count, shown_step
+    shown_step = None
+    reset_raster()
+    count = len(step_log)
+    step_scale.configure(to=count)
+    step_scale.set(count)
+    show_step(count)
+
 def moveot():
-    global MAZE, start_grid, end_grid, m, n, openc, count
+    global MAZE, start_grid, end_grid, m, n, count, shown_step
+    global view_fig, view_canvas, view_window
     n1 = int(e.get())
     n2 = int(e2.get())
     n3 = int(e3.get())
     n4 = int(e4.get())
 
-    MAZE = [
-        [0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 1, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 1, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 1, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
-    ]
+    MAZE = load_map_entry()
 
     # 获取迷宫形状
-    m = len(MAZE[0])
-    n = len(MAZE)
+    n, m = MAZE.shape
 
     start_grid = Grid(n1, n2)
     end_grid = Grid(n3, n4)
 
-    # 根据选择的算法执行
-    alg = algorithm_label.get()
-    if alg == "A*":
-        result_grid = a_start_search(start_grid, end_grid)
-    else:
-        result_grid = dijkstra_search(start_grid, end_grid)
-
-    # 路径回溯
-    path = []
-    while result_grid is not None:
-        path.append(Grid(result_grid.x, result_grid.y))
-        result_grid = result_grid.parent
-
-    # 绘制最终路径图
-    draw_picture(m, n, path)
+    run_search()
+
+    # 按迷宫尺寸建一个显示图形，之后的每一步都画在它上面
+    if view_canvas is not None:
+        bg_canvas.delete(view_window)
+        view_canvas.get_tk_widget().destroy()
+        plt.close(view_fig)
+    view_fig = plt.figure(figsize=(6, 6 * (n / max(1, m))))
+    view_fig.add_subplot(111)
+    view_canvas = FigureCanvasTkAgg(view_fig, master=bg_canvas)
+    view_window = bg_canvas.create_window(700, 300, window=view_canvas.get_tk_widget())
+    view_canvas.mpl_connect('button_press_event', on_click)
+    view_canvas.mpl_connect('scroll_event', on_scroll)
+    view_canvas.mpl_connect('draw_event', on_draw)
+    shown_step = None
+    setup_view()
 
     count = 0
+    step_scale.configure(to=len(step_log))
+    step_scale.set(0)
 
 def moveot1():
-    global count, success
-    # 若 openc 为空（尚未运行），直接返回
-    if not openc and 'success' not in globals():
+    global count
+    # 尚未运行时直接返回
+    if step_log is None:
         return
-    if count >= len(openc):
-        canvas = FigureCanvasTkAgg(success, master=bg_canvas)
-        canvas.draw()
-        bg_canvas.create_window(700, 300, window=canvas.get_tk_widget())
-    else:
-        canvas = FigureCanvasTkAgg(openc[count], master=bg_canvas)
-        canvas.draw()
-        bg_canvas.create_window(700, 300, window=canvas.get_tk_widget())
+    show_step(count)
+    step_scale.set(count)
+    if count < len(step_log):
         count += 1
 
-b = tk.Button(root, text = "Run", command=moveot, width=10, height=2 )
-bg_canvas.create_window(80, 360, window=b)
-
-b1 = tk.Button(root, text = "Next", command=moveot1, width=10, height=2 )
-bg_canvas.create_window(80, 430, window=b1)
-
-root.mainloop()
+def main():
+    """建立窗口并进入事件循环；只 import 本文件（例如做基准测试）时不会创建任何 Tk 对象。"""
+    global root, algorithm_label, bg_canvas, e, e2, e3, e4, e5, e6, e7, step_scale
+    root = tk.Tk()
+    root.title("A* vs Dijkstra")
+    root.geometry('1000x700')
+
+    # 全局选择标签（显示当前算法）
+    algorithm_label = tk.StringVar(value="A*")  # 默认 A*
+
+    # 背景图（background.png）
+    try:
+        bg_image = Image.open("background.png")
+        bg_image = bg_image.resize((1000, 700))
+        bg_photo = ImageTk.PhotoImage(bg_image)
+        bg_canvas = tk.Canvas(root, width=1000, height=600)
+        bg_canvas.pack(fill="both", expand=True)
+        bg_canvas.create_image(0, 0, image=bg_photo, anchor="nw")
+    except Exception:
+        # 若没有背景图则使用普通 frame
+        bg_canvas = tk.Canvas(root, width=1000, height=600, bg="#f0f0f0")
+        bg_canvas.pack(fill="both", expand=True)
+
+    # 显示当前算法
+    alg_label_widget = tk.Label(root, textvariable=algorithm_label, bg="#ffffff", font=("Arial", 10, "bold"))
+    bg_canvas.create_window(200, 30, window=alg_label_widget)
+
+    # 算法选择按钮
+    btn_astar = tk.Button(root, text="选择 A*", command=select_astar, width=12)
+    bg_canvas.create_window(120, 60, window=btn_astar)
+    btn_dijkstra = tk.Button(root, text="选择 Dijkstra", command=select_dijkstra, width=12)
+    bg_canvas.create_window(260, 60, window=btn_dijkstra)
+    btn_jps = tk.Button(root, text="选择 JPS", command=select_jps, width=12)
+    bg_canvas.create_window(120, 85, window=btn_jps)
+    btn_jps_plus = tk.Button(root, text="选择 JPS+", command=select_jps_plus, width=12)
+    bg_canvas.create_window(260, 85, window=btn_jps_plus)
+    btn_alt = tk.Button(root, text="选择 ALT", command=select_alt, width=12)
+    bg_canvas.create_window(300, 170, window=btn_alt)
+    btn_bi_astar = tk.Button(root, text="选择 双向 A*", command=select_bi_astar, width=12)
+    bg_canvas.create_window(300, 200, window=btn_bi_astar)
+    btn_bi_dijkstra = tk.Button(root, text="选择 双向 Dijkstra", command=select_bi_dijkstra, width=14)
+    bg_canvas.create_window(300, 230, window=btn_bi_dijkstra)
+    btn_dstar = tk.Button(root, text="选择 D* Lite", command=select_dstar, width=12)
+    bg_canvas.create_window(300, 260, window=btn_dstar)
+    btn_hpa = tk.Button(root, text="选择 HPA*", command=select_hpa, width=12)
+    bg_canvas.create_window(300, 290, window=btn_hpa)
+    btn_weighted_astar = tk.Button(root, text="选择 加权 A*", command=select_weighted_astar, width=12)
+    bg_canvas.create_window(300, 320, window=btn_weighted_astar)
+    btn_ara = tk.Button(root, text="选择 ARA*", command=select_ara, width=12)
+    bg_canvas.create_window(300, 350, window=btn_ara)
+
+    # 输入与控件（放在 canvas 上）
+    label= tk.Label(root, text="起点的x坐标", bg="#ffffff")
+    bg_canvas.create_window(80, 110, window=label)
+    e = tk.Entry(root, show=None, width=10)
+    e.insert(0, "1")
+    bg_canvas.create_window(80, 135, window=e)
+
+    label2= tk.Label(root, text="起点的y坐标", bg="#ffffff")
+    bg_canvas.create_window(80, 170, window=label2)
+    e2 = tk.Entry(root, show=None, width=10)
+    e2.insert(0, "1")
+    bg_canvas.create_window(80, 195, window=e2)
+
+    label3= tk.Label(root, text="终点的x坐标", bg="#ffffff")
+    bg_canvas.create_window(80, 230, window=label3)
+    e3 = tk.Entry(root, show=None, width=10)
+    e3.insert(0, "7")
+    bg_canvas.create_window(80, 255, window=e3)
+
+    label4= tk.Label(root, text="终点的y坐标", bg="#ffffff")
+    bg_canvas.create_window(80, 290, window=label4)
+    e4 = tk.Entry(root, show=None, width=10)
+    e4.insert(0, "7")
+    bg_canvas.create_window(80, 315, window=e4)
+
+    label5 = tk.Label(root, text="地图文件（.map / .png / .npy，可空）", bg="#ffffff")
+    bg_canvas.create_window(300, 110, window=label5)
+    e5 = tk.Entry(root, show=None, width=30)
+    bg_canvas.create_window(300, 135, window=e5)
+
+    label6 = tk.Label(root, text="权重 / ARA* 时间预算(ms)", bg="#ffffff")
+    bg_canvas.create_window(300, 385, window=label6)
+    e6 = tk.Entry(root, show=None, width=6)
+    e6.insert(0, "2")
+    bg_canvas.create_window(260, 410, window=e6)
+    e7 = tk.Entry(root, show=None, width=6)
+    e7.insert(0, "50")
+    bg_canvas.create_window(340, 410, window=e7)
+
+    b = tk.Button(root, text = "Run", command=moveot, width=10, height=2 )
+    bg_canvas.create_window(80, 360, window=b)
+
+    b1 = tk.Button(root, text = "Next", command=moveot1, width=10, height=2 )
+    bg_canvas.create_window(80, 430, window=b1)
+
+    # 拖动滑块可跳到任意一步（最右端为最终路径）
+    step_scale = tk.Scale(root, from_=0, to=0, orient=tk.HORIZONTAL, length=160,
+                          label="step", command=on_scale)
+    bg_canvas.create_window(80, 510, window=step_scale)
+
+    root.mainloop()
+
+if __name__ == '__main__':
+    main()
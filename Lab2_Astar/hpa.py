@@ -0,0 +1,257 @@
+import heapq
+
+import numpy as np
+
+from pathfinding import INF, UNREACHABLE, Grid, cells_to_grid, dijkstra_distances, grid_search, octile
+
+# -----------------------
+# HPA*：分簇的层次化寻路
+# -----------------------
+# 把迷宫切成 size x size 的簇。相邻两簇的公共边上，两侧都可走的连续一段称为入口，
+# 短的入口在中点、长的在两端各放一对"过渡点"（两侧各一个格子，之间直走代价 10）。
+# 抽象图的结点是这些过渡点：跨簇的边就是过渡点对，簇内的边是同簇过渡点之间
+# 限定在簇内的最短距离。查询时先把起点、终点接入各自的簇，在抽象图上做 A*，
+# 再把每条簇内边还原成簇内的逐格路径。结果接近但不保证最优。
+# 簇内的边在抽象搜索第一次用到该簇时才计算并缓存；格子改动后只重算它所在簇
+# 四条边上的入口，并作废它和四个相邻簇的簇内边。
+CLUSTER_SIZE = 32
+ENTRANCE_SPLIT = 6  # 入口长度达到该值时在两端各放一对过渡点，否则只放中点一对
+
+class HPAGraph:
+    """maze 上的抽象图；set_cell 要求 maze 可写。"""
+
+    def __init__(self, maze, size=CLUSTER_SIZE):
+        self.maze = maze
+        self.rows, self.cols = maze.shape
+        self.size = size
+        self.crows = -(-self.rows // size)
+        self.ccols = -(-self.cols // size)
+        self.borders = {}   # (簇, 相邻簇) -> [(本侧格子, 对侧格子), ...]
+        self.partners = {}  # 过渡点 -> {对侧过渡点, ...}
+        self.intra = {}     # 簇 -> {过渡点: {同簇过渡点: 代价}}，按需计算
+        self.rebuilds = 0   # 计算过簇内边的次数
+        for cx in range(self.crows):
+            for cy in range(self.ccols):
+                if cy + 1 < self.ccols:
+                    self._build_border((cx, cy), (cx, cy + 1))
+                if cx + 1 < self.crows:
+                    self._build_border((cx, cy), (cx + 1, cy))
+
+    # ---------- 簇与入口 ----------
+    def cluster_of(self, x, y):
+        return x // self.size, y // self.size
+
+    def _bounds(self, cluster):
+        x0, y0 = cluster[0] * self.size, cluster[1] * self.size
+        return x0, y0, min(x0 + self.size, self.rows), min(y0 + self.size, self.cols)
+
+    def _neighbors_of(self, cluster):
+        cx, cy = cluster
+        for nx, ny in ((cx - 1, cy), (cx + 1, cy), (cx, cy - 1), (cx, cy + 1)):
+            if 0 <= nx < self.crows and 0 <= ny < self.ccols:
+                yield nx, ny
+
+    def _build_border(self, a, b):
+        # a 在左（或上），b 在右（或下）；沿公共边找两侧都可走的连续段
+        maze = self.maze
+        x0, y0, x1, y1 = self._bounds(a)
+        if a[0] == b[0]:
+            pairs = [((x, y1 - 1), (x, y1)) for x in range(x0, x1)]
+        else:
+            pairs = [((x1 - 1, y), (x1, y)) for y in range(y0, y1)]
+        run = []
+        transitions = []
+        for pair in pairs + [None]:
+            if pair is not None and not maze[pair[0]] and not maze[pair[1]]:
+                run.append(pair)
+                continue
+            if run:
+                if len(run) >= ENTRANCE_SPLIT:
+                    transitions += [run[0], run[-1]]
+                else:
+                    transitions.append(run[len(run) // 2])
+                run = []
+        cols = self.cols
+        transitions = [(p[0] * cols + p[1], q[0] * cols + q[1]) for p, q in transitions]
+        self.borders[(a, b)] = transitions
+        for u, v in transitions:
+            self.partners.setdefault(u, set()).add(v)
+            self.partners.setdefault(v, set()).add(u)
+
+    def _drop_border(self, a, b):
+        for u, v in self.borders.pop((a, b), ()):
+            for p, q in ((u, v), (v, u)):
+                linked = self.partners.get(p)
+                if linked is not None:
+                    linked.discard(q)
+                    if not linked:
+                        del self.partners[p]
+
+    def nodes_in(self, cluster):
+        x0, y0, x1, y1 = self._bounds(cluster)
+        nodes = set()
+        for other in self._neighbors_of(cluster):
+            key = (cluster, other) if other > cluster else (other, cluster)
+            for u, v in self.borders.get(key, ()):
+                for cell in (u, v):
+                    x, y = divmod(cell, self.cols)
+                    if x0 <= x < x1 and y0 <= y < y1:
+                        nodes.add(cell)
+        return nodes
+
+    # ---------- 簇内距离 ----------
+    def _local(self, cluster):
+        x0, y0, x1, y1 = self._bounds(cluster)
+        return x0, y0, np.ascontiguousarray(self.maze[x0:x1, y0:y1])
+
+    def _local_distances(self, cluster, cell):
+        # cell 到簇内各格子的距离（只在簇内走），返回以全局编号取值的函数
+        x0, y0, sub = self._local(cluster)
+        x, y = divmod(cell, self.cols)
+        dist = dijkstra_distances(sub, (x - x0, y - y0))
+
+        def at(other):
+            ox, oy = divmod(other, self.cols)
+            d = int(dist[ox - x0, oy - y0])
+            return INF if d == UNREACHABLE else d
+        return at
+
+    def intra_edges(self, cluster):
+        edges = self.intra.get(cluster)
+        if edges is None:
+            nodes = self.nodes_in(cluster)
+            edges = {}
+            for u in nodes:
+                dist = self._local_distances(cluster, u)
+                edges[u] = {v: dist(v) for v in nodes if v != u and dist(v) != INF}
+            self.intra[cluster] = edges
+            self.rebuilds += 1
+        return edges
+
+    def prepare(self):
+        """一次算好所有簇的簇内边（默认按需计算），适合离线预处理。"""
+        for cx in range(self.crows):
+            for cy in range(self.ccols):
+                self.intra_edges((cx, cy))
+
+    def set_cell(self, x, y, wall):
+        """修改 (x, y) 是否为障碍，只重建受影响的入口与簇内边。"""
+        if bool(self.maze[x, y]) == bool(wall):
+            return
+        self.maze[x, y] = 1 if wall else 0
+        cluster = self.cluster_of(x, y)
+        for other in self._neighbors_of(cluster):
+            key = (cluster, other) if other > cluster else (other, cluster)
+            self._drop_border(*key)
+            self._build_border(*key)
+            self.intra.pop(other, None)
+        self.intra.pop(cluster, None)
+
+    # ---------- 查询 ----------
+    def search(self, start, end, log=None):
+        """start、end 为带 .x / .y 的对象；返回终点的 Grid 链表，不可达时返回 None。
+
+        log 记录的是抽象图上的扩展（过渡点），不含最后的逐格还原。"""
+        cols = self.cols
+        s = start.x * cols + start.y
+        t = end.x * cols + end.y
+        if self.maze[start.x, start.y] or self.maze[end.x, end.y]:
+            return None
+        cs, ct = self.cluster_of(start.x, start.y), self.cluster_of(end.x, end.y)
+
+        # 起点、终点临时接入所在簇的过渡点
+        extra = {}
+
+        def link(u, v, d):
+            extra.setdefault(u, {})[v] = d
+            extra.setdefault(v, {})[u] = d
+
+        for cell, cluster in ((s, cs), (t, ct)):
+            dist = self._local_distances(cluster, cell)
+            for node in self.nodes_in(cluster):
+                if node != cell and dist(node) != INF:
+                    link(cell, node, dist(node))
+            if cell == s and cs == ct and dist(t) != INF:
+                link(s, t, dist(t))
+
+        def h_of(u):
+            ux, uy = divmod(u, cols)
+            return octile(ux - end.x, uy - end.y)
+
+        g = {s: 0}
+        parent = {s: -1}
+        closed = set()
+        heap = [(h_of(s), 0, s)]
+        counter = 1
+        if log is not None:
+            log.begin(cols, s, 0, h_of(s))
+        while heap:
+            _, _, u = heapq.heappop(heap)
+            if u in closed:
+                continue
+            closed.add(u)
+            if u == t:
+                if log is not None:
+                    log.record(u, ())
+                break
+            ux, uy = divmod(u, cols)
+            edges = list(extra.get(u, {}).items())
+            edges += [(v, 10) for v in self.partners.get(u, ())]
+            edges += list(self.intra_edges(self.cluster_of(ux, uy)).get(u, {}).items())
+            updates = [] if log is not None else None
+            for v, cost in edges:
+                if v in closed:
+                    continue
+                ng = g[u] + cost
+                if ng < g.get(v, INF):
+                    g[v] = ng
+                    parent[v] = u
+                    hv = h_of(v)
+                    heapq.heappush(heap, (ng + hv, counter, v))
+                    counter += 1
+                    if updates is not None:
+                        updates.append((v, ng, hv))
+            if log is not None:
+                log.record(u, updates)
+
+        if t not in closed:
+            return None
+        nodes = []
+        cell = t
+        while cell != -1:
+            nodes.append(cell)
+            cell = parent[cell]
+        nodes.reverse()
+        return cells_to_grid(self._refine(nodes))
+
+    def _refine(self, nodes):
+        # 抽象路径还原为逐格路径：跨簇的边本身就是一步，簇内的边在簇内再搜一次
+        cols = self.cols
+        cells = [divmod(nodes[0], cols)]
+        for u, v in zip(nodes, nodes[1:]):
+            (ux, uy), (vx, vy) = divmod(u, cols), divmod(v, cols)
+            cluster = self.cluster_of(ux, uy)
+            if cluster != self.cluster_of(vx, vy):
+                cells.append((vx, vy))
+                continue
+            x0, y0, sub = self._local(cluster)
+            goal = Grid(vx - x0, vy - y0)
+            local = grid_search(sub, Grid(ux - x0, uy - y0), goal,
+                                heuristic=lambda x, y: octile(x - goal.x, y - goal.y))
+            piece = []
+            while local is not None:
+                piece.append((local.x + x0, local.y + y0))
+                local = local.parent
+            cells += piece[::-1][1:]
+        return cells
+
+graph_cache = (None, None)  # (迷宫, HPAGraph)，迷宫不变时复用
+
+def graph_for(maze, size=CLUSTER_SIZE):
+    global graph_cache
+    if graph_cache[0] is not maze or graph_cache[1].size != size:
+        graph_cache = (maze, HPAGraph(maze, size))
+    return graph_cache[1]
+
+def hpa_search(maze, start, end, log=None):
+    return graph_for(maze).search(start, end, log)
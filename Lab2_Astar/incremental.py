@@ -0,0 +1,169 @@
+import heapq
+
+import numpy as np
+
+from maze_io import flat_view
+from pathfinding import DIRECTIONS, INF, octile
+
+# -----------------------
+# D* Lite：障碍变化时增量修复
+# -----------------------
+# 从终点向起点反向做 LPA*：g 为已确认的到终点代价，rhs 为由邻居推出的一步预估，
+# 两者不等的格子（不一致）才放进优先队列。格子变成障碍或空地时只重新计算
+# 它和周围 8 个格子的 rhs（斜向能否通过也只取决于这 9 个格子），
+# 再把不一致传播到真正受影响的区域，其余部分的 g 保持不变。
+# 代价与不能穿角的规则同 pathfinding.grid_search，启发式为八方向距离。
+
+class DStarLite:
+    """在可写的 uint8 迷宫上维护 start -> goal 的最短路；start、goal 为 (x, y)。
+
+    set_cell 修改障碍后再调用 path() 即可得到修复后的路径，
+    move_start 用于沿路径移动起点（终点固定）。"""
+
+    def __init__(self, maze, start, goal):
+        if not maze.flags.writeable:
+            maze = np.array(maze)
+        self.maze = maze
+        self.rows, self.cols = maze.shape
+        self.blocked = flat_view(maze)  # 与 maze 共享内存，set_cell 直接写入
+        size = self.rows * self.cols
+        self.g = [INF] * size
+        self.rhs = [INF] * size
+        self.start = start[0] * self.cols + start[1]
+        self.sx, self.sy = start
+        self.goal = goal[0] * self.cols + goal[1]
+        self.km = 0          # 起点移动累积的启发式偏移
+        self.heap = []
+        self.queued = {}     # 格子 -> 当前有效的键，堆里键不符的条目为过期条目
+        self.expansions = 0  # 累计扩展次数
+        self.rhs[self.goal] = 0
+        self._push(self.goal)
+
+    def _h(self, u):
+        ux, uy = divmod(u, self.cols)
+        return octile(ux - self.sx, uy - self.sy)
+
+    def _key(self, u):
+        m = min(self.g[u], self.rhs[u])
+        return (m + self._h(u) + self.km, m)
+
+    def _push(self, u):
+        key = self._key(u)
+        self.queued[u] = key
+        heapq.heappush(self.heap, (key, u))
+
+    def _neighbors(self, u):
+        # 与 u 之间可以直接移动的格子及代价（网格是无向的，前驱即后继）
+        rows, cols, blocked = self.rows, self.cols, self.blocked
+        if blocked[u]:
+            return
+        ux, uy = divmod(u, cols)
+        for dx, dy, cost in DIRECTIONS:
+            vx, vy = ux + dx, uy + dy
+            if vx < 0 or vx >= rows or vy < 0 or vy >= cols:
+                continue
+            v = vx * cols + vy
+            if blocked[v]:
+                continue
+            if dx and dy and (blocked[ux * cols + vy] or blocked[vx * cols + uy]):
+                continue
+            yield v, cost
+
+    def _update(self, u):
+        # 按邻居重新计算 rhs(u)，再按是否一致决定入队或出队
+        g = self.g
+        if u != self.goal:
+            self.rhs[u] = min((cost + g[v] for v, cost in self._neighbors(u)), default=INF)
+        self._requeue(u)
+
+    def _requeue(self, u):
+        if self.g[u] != self.rhs[u]:
+            self._push(u)
+        else:
+            self.queued.pop(u, None)
+
+    def _top(self):
+        # 跳过过期条目，返回 (键, 格子)；队列为空时返回 None
+        heap, queued = self.heap, self.queued
+        while heap and queued.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def compute(self):
+        """传播不一致直到起点的 g 确定，返回本次扩展的格子数。"""
+        g, rhs, s = self.g, self.rhs, self.start
+        count = 0
+        while True:
+            top = self._top()
+            if top is None:
+                break
+            key, u = top
+            if key >= self._key(s) and rhs[s] == g[s]:
+                break
+            heapq.heappop(self.heap)
+            count += 1
+            new_key = self._key(u)
+            if key < new_key:
+                self._push(u)
+            elif g[u] > rhs[u]:
+                # g 变小：邻居的 rhs 只可能随之变小，不必重新扫描
+                gu = g[u] = rhs[u]
+                del self.queued[u]
+                for v, cost in self._neighbors(u):
+                    if cost + gu < rhs[v] and v != self.goal:
+                        rhs[v] = cost + gu
+                        self._requeue(v)
+            else:
+                # g 变大：只有原来经由 u 得到 rhs 的邻居需要重新计算
+                old = g[u]
+                g[u] = INF
+                self._update(u)
+                for v, cost in self._neighbors(u):
+                    if rhs[v] == cost + old:
+                        self._update(v)
+        self.expansions += count
+        return count
+
+    def set_cell(self, x, y, wall):
+        """把 (x, y) 设为障碍（wall=True）或空地，并标记受影响的格子。"""
+        u = x * self.cols + y
+        if bool(self.blocked[u]) == bool(wall):
+            return
+        # 先记下变化前的邻居：变成障碍后 _neighbors(u) 为空
+        affected = {u}
+        for dx, dy, _ in DIRECTIONS:
+            vx, vy = x + dx, y + dy
+            if 0 <= vx < self.rows and 0 <= vy < self.cols:
+                affected.add(vx * self.cols + vy)
+        self.blocked[u] = 1 if wall else 0
+        if wall:
+            self.g[u] = INF
+            self.rhs[u] = INF
+        elif u == self.goal:
+            self.rhs[u] = 0  # _update 不重新计算终点的 rhs，恢复成空地时要手动复原
+        for v in affected:
+            self._update(v)
+
+    def move_start(self, x, y):
+        """起点移动到 (x, y)；之前的搜索结果继续有效，只需调整键的偏移。"""
+        new_start = x * self.cols + y
+        self.km += self._h(new_start)
+        self.start = new_start
+        self.sx, self.sy = x, y
+
+    def cost(self):
+        self.compute()
+        return self.g[self.start]
+
+    def path(self):
+        """修复后返回起点到终点的格子列表 [(x, y), ...]，不可达时返回 None。"""
+        self.compute()
+        g = self.g
+        u = self.start
+        if g[u] == INF:
+            return None
+        cells = [divmod(u, self.cols)]
+        while u != self.goal:
+            u = min(self._neighbors(u), key=lambda item: item[1] + g[item[0]])[0]
+            cells.append(divmod(u, self.cols))
+        return cells
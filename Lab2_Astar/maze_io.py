@@ -0,0 +1,111 @@
+import os
+from collections import namedtuple
+
+import numpy as np
+
+# -----------------------
+# 迷宫表示
+# -----------------------
+# 迷宫统一存成 C 连续的 uint8 二维数组，0 为可走、1 为障碍；
+# 第一维是行（代码中的 x），第二维是列（代码中的 y），与原来的 MAZE[x][y] 一致。
+
+FREE, WALL = 0, 1
+MAP_PASSABLE = b'.GS'   # MovingAI 地图中可通行的字符，其余（@ O T W）视为障碍
+
+Scenario = namedtuple('Scenario', 'bucket map_name start end optimal')
+
+def as_grid(maze):
+    """把嵌套列表或任意数组转成 C 连续的 uint8 迷宫；已经符合要求时不复制。"""
+    grid = np.asarray(maze)
+    if grid.dtype != np.uint8:
+        grid = (grid != 0).astype(np.uint8)
+    return np.ascontiguousarray(grid)
+
+def flat_view(grid):
+    """返回迷宫的一维 memoryview，按 x * cols + y 取值。
+
+    不复制数据（内存映射的文件也一样），逐元素读取得到的是 Python int，
+    在纯 Python 的搜索循环里比 NumPy 标量下标快得多。"""
+    return memoryview(as_grid(grid)).cast('B')
+
+# -----------------------
+# 读取各种格式
+# -----------------------
+def load_map(path):
+    """读取 MovingAI .map 文件（type / height / width / map 头 + 字符网格）。"""
+    with open(path, 'rb') as f:
+        header = {}
+        for line in f:
+            line = line.strip()
+            if line == b'map':
+                break
+            key, _, value = line.partition(b' ')
+            header[key.decode()] = value.decode()
+        height, width = int(header['height']), int(header['width'])
+        rows = [f.readline().rstrip(b'\r\n')[:width] for _ in range(height)]
+    if any(len(row) != width for row in rows):
+        raise ValueError(f"{path}: 地图行数或宽度与文件头不符")
+    chars = np.frombuffer(b''.join(rows), dtype=np.uint8).reshape(height, width)
+    passable = np.isin(chars, np.frombuffer(MAP_PASSABLE, dtype=np.uint8))
+    return np.where(passable, FREE, WALL).astype(np.uint8)
+
+def load_scen(path):
+    """读取 MovingAI .scen 文件，返回 Scenario 列表。
+
+    文件中的坐标是 (列, 行)，这里转成代码使用的 (x=行, y=列)。
+    optimal 是文件给出的最优长度（斜向按 sqrt(2) 计），与本程序 10/14 的代价只是近似比例。"""
+    scenarios = []
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) < 9 or parts[0] == 'version':
+                continue
+            sx, sy, gx, gy = map(int, parts[4:8])
+            scenarios.append(Scenario(int(parts[0]), parts[1], (sy, sx), (gy, gx), float(parts[8])))
+    return scenarios
+
+def load_png(path, threshold=128):
+    """读取黑白位图：灰度低于 threshold 的像素为障碍。"""
+    from PIL import Image
+    with Image.open(path) as image:
+        gray = np.asarray(image.convert('L'))
+    return (gray < threshold).astype(np.uint8)
+
+def save_maze(path, grid):
+    np.save(path, as_grid(grid))
+
+def load_maze(path, mmap=False):
+    """按扩展名读取 .map / .npy / 图片格式的迷宫。
+
+    mmap=True 时以只读内存映射返回：.npy 直接映射，其他格式先在旁边
+    写一个 <文件名>.npy 缓存（源文件更新后重写），多次查询、多个进程都共用同一份数据。"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.npy':
+        return np.load(path, mmap_mode='r' if mmap else None)
+    if mmap:
+        npy_path = path + '.npy'
+        if not os.path.exists(npy_path) or os.path.getmtime(npy_path) < os.path.getmtime(path):
+            save_maze(npy_path, load_maze(path))
+        return np.load(npy_path, mmap_mode='r')
+    if ext == '.map':
+        return load_map(path)
+    return load_png(path)
+
+# -----------------------
+# ALT 地标距离表
+# -----------------------
+def landmark_path(path):
+    return path + '.alt.npy'
+
+def cached_landmarks(path, maze, k=None, progress=None):
+    """读取保存在地图旁边的地标距离表（<地图>.alt.npy，内存映射）；
+    不存在、比地图旧或尺寸不符时用 pathfinding.select_landmarks 选 k 个地标重建并保存。"""
+    from pathfinding import LANDMARK_COUNT, select_landmarks
+    table_path = landmark_path(path)
+    if os.path.exists(table_path) and os.path.getmtime(table_path) >= os.path.getmtime(path):
+        tables = np.load(table_path, mmap_mode='r')
+        if tables.shape[1:] == np.shape(maze):
+            return tables
+    tables = select_landmarks(maze, k or LANDMARK_COUNT, progress)
+    np.save(table_path, tables)
+    return np.load(table_path, mmap_mode='r')
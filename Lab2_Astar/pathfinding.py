@@ -0,0 +1,894 @@
+import os
+import time
+import heapq
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from maze_io import as_grid, flat_view
+
+# 网格寻路引擎：A* / Dijkstra / JPS / JPS+，不依赖 Tk，可以单独导入。
+# 迷宫是 uint8 二维数组（见 maze_io），格子 (x, y) 即第 x 行第 y 列。
+
+# 八个方向 (dx, dy, 代价)：直走 10，斜走 14
+DIRECTIONS = [(0, -1, 10), (0, 1, 10), (-1, 0, 10), (1, 0, 10),
+              (1, 1, 14), (-1, -1, 14), (-1, 1, 14), (1, -1, 14)]
+INF = float('inf')
+
+class Grid:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.f = 0
+        self.g = 0
+        self.h = 0
+        self.parent = None
+    def init_grid(self, parent, end):
+        self.parent = parent
+        if abs(self.x - parent.x) + abs(self.y - parent.y) == 2:
+            self.g = parent.g + 14
+        else:
+            self.g = parent.g + 10
+        # end 可能为 None（在特定调用路径），处理稳健性
+        if end is not None:
+            self.h = (abs(self.x - end.x) + abs(self.y - end.y))*10
+        else:
+            self.h = 0
+        self.f = self.g + self.h
+
+# -----------------------
+# 公共搜索：二叉堆 + 扁平数组
+# -----------------------
+# 格子 (x, y) 编号为 x * cols + y；g / parent / closed 都是按编号索引的列表，
+# 查找与更新均为 O(1)。堆中允许同一格子有多个旧条目（惰性删除），
+# 弹出时若该格子已关闭则直接跳过，相当于 decrease-key。
+def grid_search(maze, start, end, use_heuristic=True, log=None, heuristic=None):
+    """在 maze 上从 start 搜到 end（带 .x / .y 的对象），返回终点的 Grid 链表，不可达时返回 None。
+
+    use_heuristic=False 即 Dijkstra；heuristic(x, y) 可替换默认的曼哈顿距离；
+    log 为 StepLog 时记录每一步。"""
+    cols = maze.shape[1]
+    ex, ey = end.x, end.y
+    if heuristic is not None:
+        h_of = heuristic
+    elif use_heuristic:
+        def h_of(x, y):
+            return (abs(x - ex) + abs(y - ey)) * 10
+    else:
+        def h_of(x, y):
+            return 0
+
+    t = ex * cols + ey
+    g, parent = _best_first(maze, start.x * cols + start.y, t, h_of, log)
+    if g[t] == INF:
+        return None
+    return _make_path_grid(t, g, parent, cols, h_of)
+
+def _best_first(maze, s, t, h_of, log):
+    # 从编号 s 出发按 f = g + h 扩展，关闭 t 时停止（t 为 -1 时走遍整个连通区域），返回 g / parent 列表
+    rows, cols = maze.shape
+    blocked = flat_view(maze)  # 直接读迷宫数组，不复制
+    size = rows * cols
+    g = [INF] * size
+    parent = [-1] * size
+    closed = bytearray(size)
+    if blocked[s] or (t >= 0 and blocked[t]):
+        return g, parent  # 起点或终点是障碍：不可达，一个格子也不扩展
+    sx, sy = divmod(s, cols)
+    g[s] = 0
+    heap = [(h_of(sx, sy), 0, s)]
+    counter = 1  # f 相同时先进先出
+    if log is not None:
+        log.begin(cols, s, 0, h_of(sx, sy))
+    while heap:
+        # 取 f 最小的格子；已关闭的是过期条目
+        f, _, u = heapq.heappop(heap)
+        if closed[u]:
+            continue
+        closed[u] = 1
+        if u == t:
+            if log is not None:
+                log.record(u, ())
+            break
+
+        ux, uy = divmod(u, cols)
+        gu = g[u]
+        updates = [] if log is not None else None
+        for dx, dy, cost in DIRECTIONS:
+            vx, vy = ux + dx, uy + dy
+            if vx < 0 or vx >= rows or vy < 0 or vy >= cols:
+                continue
+            v = vx * cols + vy
+            if blocked[v] or closed[v]:
+                continue
+            # 斜向移动时两侧任一为障碍则不能穿角
+            if dx and dy and (blocked[ux * cols + vy] or blocked[vx * cols + uy]):
+                continue
+            ng = gu + cost
+            if ng < g[v]:
+                g[v] = ng
+                parent[v] = u
+                hv = h_of(vx, vy)
+                heapq.heappush(heap, (ng + hv, counter, v))
+                counter += 1
+                if updates is not None:
+                    updates.append((v, ng, hv))
+        if log is not None:
+            log.record(u, updates)
+
+    return g, parent
+
+def _make_grid(cell, g, cols, h_of):
+    x, y = divmod(cell, cols)
+    grid = Grid(x, y)
+    grid.g = g[cell]
+    grid.h = h_of(x, y)
+    grid.f = grid.g + grid.h
+    return grid
+
+def _make_path_grid(t, g, parent, cols, h_of):
+    # 把 parent 数组还原成 Grid 链表，返回终点（与原接口一致）
+    chain = []
+    cell = t
+    while cell != -1:
+        chain.append(_make_grid(cell, g, cols, h_of))
+        cell = parent[cell]
+    for child, par in zip(chain, chain[1:]):
+        child.parent = par
+    return chain[0]
+
+# -----------------------
+# 搜索事件日志
+# -----------------------
+class StepLog:
+    """按步记录搜索过程：第 i 步关闭的格子，以及本步新加入或 g 值变小的格子 (格子, g, h)。
+
+    界面需要第 k 步时再从日志重放出 open / closed 集合，
+    每隔 CHECKPOINT 步保存一次状态，向回拖动时从最近的检查点重放。
+    双向搜索时反向一侧（side=1）的格子以 ~格子 存放，两侧的集合互不覆盖。"""
+    CHECKPOINT = 256
+
+    def __init__(self):
+        self.cols = 1
+        self.roots = []
+        self.steps = []
+        self._checkpoints = {}
+        self._cursor = None
+
+    def begin(self, cols, cell, g, h, side=0):
+        self.cols = cols
+        self.roots = []
+        self.steps = []
+        self._checkpoints = {}
+        self._cursor = None
+        self.add_root(cell, g, h, side)
+
+    def add_root(self, cell, g, h, side=0):
+        self.roots.append((~cell if side else cell, g, h))
+
+    def record(self, cell, updates, side=0):
+        if side:
+            cell = ~cell
+            updates = [(~v, g, h) for v, g, h in updates]
+        self.steps.append((cell, updates))
+
+    def __len__(self):
+        return len(self.steps)
+
+    def _state_at(self, k):
+        # 返回第 k 步开始前的 (open, closed)，均为 {格子: (g, h)}
+        if self._cursor is None or self._cursor[0] > k:
+            base = max((c for c in self._checkpoints if c <= k), default=None)
+            if base is None:
+                self._cursor = (0, {cell: (g, h) for cell, g, h in self.roots}, {})
+            else:
+                opened, closed = self._checkpoints[base]
+                self._cursor = (base, dict(opened), dict(closed))
+        i, opened, closed = self._cursor
+        while i < k:
+            cell, updates = self.steps[i]
+            closed[cell] = opened.pop(cell)
+            for v, g, h in updates:
+                opened[v] = (g, h)
+            i += 1
+            if i % self.CHECKPOINT == 0 and i not in self._checkpoints:
+                self._checkpoints[i] = (dict(opened), dict(closed))
+        self._cursor = (i, opened, closed)
+        return opened, closed
+
+    def state(self, k):
+        """第 k 步开始前的 (open, closed)，均为 {格子编号: (g, h)}；反向一侧的格子为 ~格子。
+
+        返回的字典在下一次调用时会被继续修改，需要保留时请复制。"""
+        return self._state_at(k)
+
+    def frame(self, k):
+        """第 k 步的 (next_list, already_list, now_grid)，用于 draw_frame。"""
+        opened, closed = self._state_at(k)
+
+        def to_grid(cell, g, h):
+            grid = Grid(*divmod(cell if cell >= 0 else ~cell, self.cols))
+            grid.g, grid.h, grid.f = g, h, g + h
+            grid.side = 0 if cell >= 0 else 1
+            return grid
+
+        next_list = [to_grid(c, g, h) for c, (g, h) in opened.items()]
+        already_list = [to_grid(c, g, h) for c, (g, h) in closed.items()]
+        now_grid = None
+        if k < len(self.steps):
+            cell = self.steps[k][0]
+            now_grid = to_grid(cell, *opened[cell])
+        return next_list, already_list, now_grid
+
+# -----------------------
+# A* 搜索（使用启发式 h）
+# -----------------------
+def astar_search(maze, start, end, log=None):
+    return grid_search(maze, start, end, use_heuristic=True, log=log)
+
+# -----------------------
+# Dijkstra 搜索（h = 0）
+# -----------------------
+def dijkstra_search(maze, start, end, log=None):
+    return grid_search(maze, start, end, use_heuristic=False, log=log)
+
+# -----------------------
+# Jump Point Search（JPS / JPS+）
+# -----------------------
+# 只在"跳点"上做 A*：沿直线或斜线一直走，直到遇到墙、终点，
+# 或出现必须经过当前格子才能最优到达的邻居（强制邻居）。
+# 代价（直 10 / 斜 14）与不能穿角的规则都与 grid_search 相同，
+# 启发式用八方向距离（octile），因此路径代价与 Dijkstra 相同。
+# JPS+ 事先为每个格子、每个方向算好跳跃距离，查询时不再逐格扫描。
+JPS_DIRS = [(dx, dy) for dx, dy, _ in DIRECTIONS]
+
+def octile(dx, dy):
+    dx, dy = abs(dx), abs(dy)
+    return 10 * (dx + dy) - 6 * min(dx, dy)
+
+def _sign(v):
+    return int(v > 0) - int(v < 0)
+
+def _pruned_dirs(dx, dy):
+    # 按到达方向剪枝后仍需尝试的方向（起点为全部 8 个）
+    if dx and dy:
+        return [(dx, 0), (0, dy), (dx, dy)]
+    if dx:
+        return [(dx, 0), (0, 1), (0, -1), (dx, 1), (dx, -1)]
+    if dy:
+        return [(0, dy), (1, 0), (-1, 0), (1, dy), (-1, dy)]
+    return JPS_DIRS
+
+def _jump_straight(ok, x, y, dx, dy, ex, ey):
+    """从 (x, y) 沿直线方向跳，返回跳点坐标；撞墙返回 None。"""
+    while True:
+        x += dx
+        y += dy
+        if not ok(x, y):
+            return None
+        if x == ex and y == ey:
+            return x, y
+        if dx:
+            if (ok(x, y - 1) and not ok(x - dx, y - 1)) or (ok(x, y + 1) and not ok(x - dx, y + 1)):
+                return x, y
+        elif (ok(x - 1, y) and not ok(x - 1, y - dy)) or (ok(x + 1, y) and not ok(x + 1, y - dy)):
+            return x, y
+
+def _jump(ok, x, y, dx, dy, ex, ey):
+    if not (dx and dy):
+        return _jump_straight(ok, x, y, dx, dy, ex, ey)
+    while True:
+        # 斜向一步：两侧都可走才能通过
+        if not (ok(x + dx, y) and ok(x, y + dy) and ok(x + dx, y + dy)):
+            return None
+        x += dx
+        y += dy
+        if x == ex and y == ey:
+            return x, y
+        if (_jump_straight(ok, x, y, dx, 0, ex, ey) is not None
+                or _jump_straight(ok, x, y, 0, dy, ex, ey) is not None):
+            return x, y
+
+def _jump_plus(tables, cols, x, y, dx, dy, ex, ey):
+    """用 JPS+ 距离表求与 _jump 相同的结果。
+
+    表中正数 k 表示 k 步处是跳点，非正数 -k 表示最多能走 k 步就撞墙；
+    终点相关的情况（终点在这条线上、或可从线上某点直线到达）在查询时判断。"""
+    s = tables[JPS_DIRS.index((dx, dy))][x * cols + y]
+    reach = abs(s)
+    a, b = (ex - x) * dx, (ey - y) * dy
+    if not (dx and dy):
+        # 直线：终点在射线上且不远于跳点或墙
+        r = a if dx else b
+        if (ey == y if dx else ex == x) and 0 < r <= reach:
+            return ex, ey
+    elif a > 0 and b > 0 and min(a, b) <= reach:
+        k = min(a, b)
+        px, py = x + k * dx, y + k * dy
+        if a == b:
+            return px, py
+        sdx, sdy = (dx, 0) if a > b else (0, dy)
+        if abs(a - b) <= abs(tables[JPS_DIRS.index((sdx, sdy))][px * cols + py]):
+            return px, py
+    if s > 0:
+        return x + s * dx, y + s * dy
+    return None
+
+def _straight_table(blocked):
+    # 沿第二维正方向的跳跃距离；越界视为墙
+    rows, cols = blocked.shape
+    pad = np.pad(blocked, 1, constant_values=True)
+    free = ~pad
+    jump = free[1:-1, 1:-1] & ((free[:-2, 1:-1] & pad[:-2, :-2]) | (free[2:, 1:-1] & pad[2:, :-2]))
+    index = np.arange(cols)
+    event = np.where(blocked | jump, index, cols)
+    nearest = np.minimum.accumulate(event[:, ::-1], axis=1)[:, ::-1]
+    after = np.full_like(nearest, cols)
+    after[:, :-1] = nearest[:, 1:]   # 本格之后第一个墙或跳点
+    k = after - index
+    hit = np.take_along_axis(np.pad(jump, ((0, 0), (0, 1))), after, axis=1)
+    return np.where(hit, k, 1 - k)
+
+def jps_plus_arrays(maze):
+    """预计算 8 个方向的跳跃距离，返回形状为 (8, 行, 列) 的数组，方向顺序同 JPS_DIRS。"""
+    blocked = np.asarray(maze) != 0
+    rows, cols = blocked.shape
+    dtype = np.int16 if max(rows, cols) < 2 ** 15 else np.int32
+    straight = {
+        (0, 1): _straight_table(blocked),
+        (0, -1): _straight_table(blocked[:, ::-1])[:, ::-1],
+        (1, 0): _straight_table(blocked.T).T,
+        (-1, 0): _straight_table(blocked.T[:, ::-1])[:, ::-1].T,
+    }
+    free = np.pad(~blocked, 1)
+    tables = dict(straight)
+    for dx, dy in [(1, 1), (-1, -1), (-1, 1), (1, -1)]:
+        pad_h = np.pad(straight[(dx, 0)] > 0, 1)
+        pad_v = np.pad(straight[(0, dy)] > 0, 1)
+        diag = np.zeros((rows + 2, cols + 2), dtype=np.int64)
+        order = range(rows, 0, -1) if dx > 0 else range(1, rows + 1)
+        cy = slice(1, cols + 1)
+        py = slice(1 + dy, cols + 1 + dy)
+        for x in order:
+            px = x + dx
+            legal = free[px, cy] & free[x, py] & free[px, py]
+            nxt = diag[px, py]
+            value = np.where(pad_h[px, py] | pad_v[px, py], 1, np.where(nxt > 0, nxt + 1, nxt - 1))
+            diag[x, cy] = np.where(legal, value, 0)
+        tables[(dx, dy)] = diag[1:-1, 1:-1]
+    return np.stack([tables[d] for d in JPS_DIRS]).astype(dtype)
+
+def jps_plus_views(arrays):
+    # 每个方向一个一维 memoryview，按编号取值得到 Python int
+    return [memoryview(np.ascontiguousarray(table)).cast('B').cast(table.dtype.char) for table in arrays]
+
+def jps_plus_tables(maze):
+    return jps_plus_views(jps_plus_arrays(maze))
+
+jps_cache = (None, None)  # (迷宫, 距离表)，迷宫不变时复用
+
+def jps_search(maze, start, end, log=None, plus=False):
+    global jps_cache
+    rows, cols = maze.shape
+    blocked = flat_view(maze)
+    ex, ey = end.x, end.y
+
+    def ok(x, y):
+        return 0 <= x < rows and 0 <= y < cols and not blocked[x * cols + y]
+
+    if plus:
+        if jps_cache[0] is not maze:
+            jps_cache = (maze, jps_plus_tables(maze))
+        tables = jps_cache[1]
+
+        def jump(x, y, dx, dy):
+            return _jump_plus(tables, cols, x, y, dx, dy, ex, ey)
+    else:
+        def jump(x, y, dx, dy):
+            return _jump(ok, x, y, dx, dy, ex, ey)
+
+    def h_of(x, y):
+        return octile(x - ex, y - ey)
+
+    g, parent = {}, {}
+    closed = set()
+    s = start.x * cols + start.y
+    t = ex * cols + ey
+    if blocked[s] or blocked[t]:
+        return None
+    g[s] = 0
+    parent[s] = -1
+    heap = [(h_of(start.x, start.y), 0, s)]
+    counter = 1
+    if log is not None:
+        log.begin(cols, s, 0, h_of(start.x, start.y))
+    while heap:
+        _, _, u = heapq.heappop(heap)
+        if u in closed:
+            continue
+        closed.add(u)
+        if u == t:
+            if log is not None:
+                log.record(u, ())
+            return _jps_path_grid(t, g, parent, cols, h_of)
+
+        ux, uy = divmod(u, cols)
+        p = parent[u]
+        if p == -1:
+            dirs = JPS_DIRS if ok(ux, uy) else []
+        else:
+            px, py = divmod(p, cols)
+            dirs = _pruned_dirs(_sign(ux - px), _sign(uy - py))
+        gu = g[u]
+        updates = [] if log is not None else None
+        for dx, dy in dirs:
+            point = jump(ux, uy, dx, dy)
+            if point is None:
+                continue
+            vx, vy = point
+            v = vx * cols + vy
+            if v in closed:
+                continue
+            ng = gu + octile(vx - ux, vy - uy)
+            if ng < g.get(v, INF):
+                g[v] = ng
+                parent[v] = u
+                hv = h_of(vx, vy)
+                heapq.heappush(heap, (ng + hv, counter, v))
+                counter += 1
+                if updates is not None:
+                    updates.append((v, ng, hv))
+        if log is not None:
+            log.record(u, updates)
+
+    return None
+
+def _jps_path_grid(t, g, parent, cols, h_of):
+    # 跳点之间补全为逐格路径，返回终点的 Grid 链表（与 grid_search 相同）
+    points = []
+    cell = t
+    while cell != -1:
+        points.append(divmod(cell, cols))
+        cell = parent[cell]
+    points.reverse()
+    cells = [points[0]]
+    for (ax, ay), (bx, by) in zip(points, points[1:]):
+        dx, dy = _sign(bx - ax), _sign(by - ay)
+        for i in range(1, max(abs(bx - ax), abs(by - ay)) + 1):
+            cells.append((ax + i * dx, ay + i * dy))
+    return cells_to_grid(cells, h_of)
+
+def cells_to_grid(cells, h_of=None):
+    """逐格路径（起点在前）转成 Grid 链表并填好 g，返回终点；空路径返回 None。"""
+    head = None
+    cost = 0
+    for i, (x, y) in enumerate(cells):
+        if i:
+            cost += octile(x - cells[i - 1][0], y - cells[i - 1][1])
+        grid = Grid(x, y)
+        grid.g, grid.h = cost, h_of(x, y) if h_of else 0
+        grid.f = grid.g + grid.h
+        grid.parent = head
+        head = grid
+    return head
+
+def jps_plus_search(maze, start, end, log=None):
+    return jps_search(maze, start, end, log=log, plus=True)
+
+# -----------------------
+# 双向 A* / Dijkstra
+# -----------------------
+# 从起点、终点同时搜索，每次扩展堆顶键值较小的一侧；扩展时若邻居已被另一侧到达，
+# 用 g_正 + g_反 更新目前最好的相遇代价 mu。停止条件保证 mu 就是最优代价：
+#   Dijkstra：两侧堆顶之和 >= mu；
+#   A*：两侧都用可采纳的八方向距离（分别指向对方的起点），两侧最小 f 中较大的 >= mu。
+def bidirectional_search(maze, start, end, use_heuristic=True, log=None):
+    rows, cols = maze.shape
+    blocked = flat_view(maze)
+    size = rows * cols
+    sx, sy, ex, ey = start.x, start.y, end.x, end.y
+    s = sx * cols + sy
+    t = ex * cols + ey
+    if blocked[s] or blocked[t]:
+        return None
+    if use_heuristic:
+        h_funcs = (lambda x, y: octile(x - ex, y - ey), lambda x, y: octile(x - sx, y - sy))
+    else:
+        h_funcs = (lambda x, y: 0, lambda x, y: 0)
+    g = ([INF] * size, [INF] * size)
+    parent = ([-1] * size, [-1] * size)
+    closed = (bytearray(size), bytearray(size))
+    g[0][s] = 0
+    g[1][t] = 0
+    heaps = ([(h_funcs[0](sx, sy), 0, s)], [(h_funcs[1](ex, ey), 0, t)])
+    counter = 1
+    if log is not None:
+        log.begin(cols, s, 0, h_funcs[0](sx, sy))
+        log.add_root(t, 0, h_funcs[1](ex, ey), side=1)
+    mu, meet = (0, s) if s == t else (INF, -1)
+
+    while True:
+        for side in (0, 1):
+            heap = heaps[side]
+            while heap and closed[side][heap[0][2]]:
+                heapq.heappop(heap)
+        if not heaps[0] or not heaps[1]:
+            break
+        top0, top1 = heaps[0][0][0], heaps[1][0][0]
+        if (max(top0, top1) if use_heuristic else top0 + top1) >= mu:
+            break
+
+        side = 0 if top0 <= top1 else 1
+        _, _, u = heapq.heappop(heaps[side])
+        gs, go, par, done = g[side], g[1 - side], parent[side], closed[side]
+        h_of = h_funcs[side]
+        done[u] = 1
+        ux, uy = divmod(u, cols)
+        gu = gs[u]
+        updates = [] if log is not None else None
+        for dx, dy, cost in DIRECTIONS:
+            vx, vy = ux + dx, uy + dy
+            if vx < 0 or vx >= rows or vy < 0 or vy >= cols:
+                continue
+            v = vx * cols + vy
+            if blocked[v] or done[v]:
+                continue
+            if dx and dy and (blocked[ux * cols + vy] or blocked[vx * cols + uy]):
+                continue
+            ng = gu + cost
+            if ng < gs[v]:
+                gs[v] = ng
+                par[v] = u
+                hv = h_of(vx, vy)
+                heapq.heappush(heaps[side], (ng + hv, counter, v))
+                counter += 1
+                if updates is not None:
+                    updates.append((v, ng, hv))
+                if ng + go[v] < mu:
+                    mu, meet = ng + go[v], v
+        if log is not None:
+            log.record(u, updates, side)
+
+    if meet == -1:
+        return None
+    forward = []
+    cell = meet
+    while cell != -1:
+        forward.append(divmod(cell, cols))
+        cell = parent[0][cell]
+    forward.reverse()
+    cell = parent[1][meet]
+    while cell != -1:
+        forward.append(divmod(cell, cols))
+        cell = parent[1][cell]
+    return cells_to_grid(forward, h_funcs[0])
+
+def bidirectional_astar_search(maze, start, end, log=None):
+    return bidirectional_search(maze, start, end, use_heuristic=True, log=log)
+
+def bidirectional_dijkstra_search(maze, start, end, log=None):
+    return bidirectional_search(maze, start, end, use_heuristic=False, log=log)
+
+# -----------------------
+# ALT：地标 + 三角不等式启发式
+# -----------------------
+# 事先从 K 个地标各做一次完整的 Dijkstra，得到到每个格子的距离 d(L, ·)。
+# 网格是无向的，对任意格子 v 和终点 t 有 |d(L, t) - d(L, v)| <= d(v, t)，
+# 取各地标中的最大值（再与八方向距离取大）作为 h，仍然可采纳且一致。
+LANDMARK_COUNT = 8      # 默认地标数
+ACTIVE_LANDMARKS = 8    # 每次查询最多使用的地标数（按对起点的估计从紧到松取）
+UNREACHABLE = np.iinfo(np.uint32).max  # 距离表中不可达格子的值
+
+def dijkstra_distances(maze, source):
+    """不设终点的 Dijkstra：返回 source 到每个格子的代价（uint32 数组，不可达为 UNREACHABLE）。"""
+    rows, cols = maze.shape
+    g, _ = _best_first(maze, source[0] * cols + source[1], -1, lambda x, y: 0, None)
+    dist = np.array(g, dtype=np.float64).reshape(rows, cols)
+    dist[np.isinf(dist)] = UNREACHABLE
+    return dist.astype(np.uint32)
+
+def select_landmarks(maze, k=LANDMARK_COUNT, progress=None):
+    """用"最远点"策略挑 k 个地标，返回形状为 (k, 行, 列) 的 uint32 距离表。
+
+    第一个地标取离中间某个可走格子最远的点，之后每次取离已选地标最远的点，
+    地标都落在这个格子所在的连通区域内；progress(i, k) 在每个地标算完后调用。"""
+    free = np.argwhere(np.asarray(maze) == 0)
+    if len(free) == 0:
+        return np.empty((0,) + maze.shape, dtype=np.uint32)
+    def reach(dist):
+        # 不可达的格子记为 -1，不会被选中
+        return np.where(dist == UNREACHABLE, -1, dist.astype(np.int64))
+
+    nearest = reach(dijkstra_distances(maze, tuple(free[len(free) // 2])))
+    tables = []
+    for i in range(k):
+        cell = np.unravel_index(int(np.argmax(nearest)), nearest.shape)
+        if tables and nearest[cell] <= 0:
+            break  # 可达的格子都已是地标
+        dist = dijkstra_distances(maze, cell)
+        tables.append(dist)
+        nearest = reach(dist) if i == 0 else np.minimum(nearest, reach(dist))
+        if progress is not None:
+            progress(i + 1, k)
+    return np.stack(tables)
+
+def alt_heuristic(tables, cols, start, end, active=ACTIVE_LANDMARKS):
+    """返回 h(x, y) = max(八方向距离, max |d(L, t) - d(L, v)|)。"""
+    s = start.x * cols + start.y
+    t = end.x * cols + end.y
+    ex, ey = end.x, end.y
+    usable = [view for view in tables if view[t] != UNREACHABLE and view[s] != UNREACHABLE]
+    usable.sort(key=lambda view: -abs(view[t] - view[s]))
+    chosen = [(view, view[t]) for view in usable[:active]]
+
+    def h_of(x, y):
+        best = octile(x - ex, y - ey)
+        v = x * cols + y
+        for view, dt in chosen:
+            dv = view[v]
+            diff = dv - dt if dv > dt else dt - dv
+            if diff > best and dv != UNREACHABLE:
+                best = diff
+        return best
+    return h_of
+
+alt_cache = (None, None)  # (迷宫, 每个地标一个一维 memoryview)
+
+def use_landmarks(maze, tables):
+    """指定 maze 的地标距离表（例如从磁盘读入的），之后 alt_search 直接使用。"""
+    global alt_cache
+    alt_cache = (maze, [memoryview(np.ascontiguousarray(table)).cast('B').cast('I') for table in tables])
+
+def alt_search(maze, start, end, log=None):
+    if alt_cache[0] is not maze:
+        use_landmarks(maze, select_landmarks(maze))
+    h_of = alt_heuristic(alt_cache[1], maze.shape[1], start, end)
+    return grid_search(maze, start, end, log=log, heuristic=h_of)
+
+# -----------------------
+# 加权 A* / ARA*（限时逐步改进）
+# -----------------------
+# 加权 A* 用 f = g + w * h（h 为一致的八方向距离），不重开已关闭的格子，
+# 找到的路径代价不超过最优的 w 倍。ARA* 先用较大的 w 很快给出一条路径，
+# 然后逐步减小 w，复用上一轮的 g 值继续改进：上一轮已关闭、本轮 g 又变小的格子
+# 先放进 INCONS，下一轮再加入 OPEN。每轮结束后的次优界为
+#   min(w, g(终点) / min{g(v) + h(v) : v 在 OPEN 或 INCONS 中})。
+WEIGHT = 2                                 # 加权 A* 的默认权重
+ARA_WEIGHTS = (3, 2, 1.5, 1.25, 1.1, 1)    # ARA* 依次使用的权重
+DEADLINE_CHECK = 256                       # 每扩展这么多个结点检查一次时间
+
+def weighted_astar_search(maze, start, end, log=None, weight=WEIGHT):
+    ex, ey = end.x, end.y
+    return grid_search(maze, start, end, log=log,
+                       heuristic=lambda x, y: weight * octile(x - ex, y - ey))
+
+def anytime_paths(maze, start, end, deadline_ms=None, weights=ARA_WEIGHTS, log=None):
+    """ARA*：每得到一条更好的路径就产出 (终点 Grid 链表, 次优界)。
+
+    deadline_ms 为从调用开始计的时间预算（毫秒，None 表示不限），到时立即停止，
+    此前产出的最后一条就是目前最好的路径；预算内一条也没找到时什么都不产出。
+    log 只保留最后一轮的搜索过程。"""
+    deadline = None if deadline_ms is None else time.perf_counter() + deadline_ms / 1000
+    rows, cols = maze.shape
+    blocked = flat_view(maze)
+    size = rows * cols
+    ex, ey = end.x, end.y
+    s = start.x * cols + start.y
+    t = ex * cols + ey
+    if blocked[s] or blocked[t]:
+        return
+
+    def h_of(x, y):
+        return octile(x - ex, y - ey)
+
+    g = [INF] * size
+    parent = [-1] * size
+    g[s] = 0
+    opened = {s}          # 本轮 OPEN 中的格子
+    incons = set()
+    best = best_bound = INF
+    expanded = 0
+    for weight in weights:
+        # 重建 OPEN：上一轮剩下的加上 INCONS，按新的权重计算键
+        opened |= incons
+        incons = set()
+        closed = bytearray(size)
+        heap = []
+        for cell in opened:
+            x, y = divmod(cell, cols)
+            heap.append((g[cell] + weight * h_of(x, y), cell, g[cell]))
+        heapq.heapify(heap)
+        if log is not None:
+            roots = sorted(opened)
+            x, y = divmod(roots[0], cols)
+            log.begin(cols, roots[0], g[roots[0]], round(weight * h_of(x, y), 1))
+            for cell in roots[1:]:
+                x, y = divmod(cell, cols)
+                log.add_root(cell, g[cell], round(weight * h_of(x, y), 1))
+
+        while heap and g[t] > heap[0][0]:
+            f, u, gu = heapq.heappop(heap)
+            if closed[u] or gu != g[u]:
+                continue  # 过期条目
+            closed[u] = 1
+            opened.discard(u)
+            expanded += 1
+            if deadline is not None and expanded % DEADLINE_CHECK == 0 and time.perf_counter() > deadline:
+                return
+            ux, uy = divmod(u, cols)
+            updates = [] if log is not None else None
+            for dx, dy, cost in DIRECTIONS:
+                vx, vy = ux + dx, uy + dy
+                if vx < 0 or vx >= rows or vy < 0 or vy >= cols:
+                    continue
+                v = vx * cols + vy
+                if blocked[v]:
+                    continue
+                if dx and dy and (blocked[ux * cols + vy] or blocked[vx * cols + uy]):
+                    continue
+                ng = gu + cost
+                if ng < g[v]:
+                    g[v] = ng
+                    parent[v] = u
+                    if closed[v]:
+                        incons.add(v)
+                    else:
+                        opened.add(v)
+                        hv = weight * h_of(vx, vy)
+                        heapq.heappush(heap, (ng + hv, v, ng))
+                        if updates is not None:
+                            updates.append((v, ng, round(hv, 1)))
+            if log is not None:
+                log.record(u, updates)
+
+        if g[t] == INF:
+            return  # 不可达：更小的权重也找不到
+        if log is not None and t in opened:
+            log.record(t, ())
+        frontier = [g[c] + h_of(*divmod(c, cols)) for c in opened | incons]
+        bound = min(weight, g[t] / min(frontier)) if frontier and min(frontier) else 1
+        bound = max(bound, 1)
+        if g[t] < best or bound < best_bound:
+            best, best_bound = g[t], bound
+            yield _make_path_grid(t, g, parent, cols, lambda x, y: 0), bound
+        if bound == 1:
+            return
+
+def ara_search(maze, start, end, log=None, deadline_ms=None):
+    """在 deadline_ms 毫秒内返回 ARA* 找到的最好路径；一条也没找到时返回 None。
+
+    默认不限时间，一直改进到最优，这样 SEARCHES / find_paths / 基准测试的结果与机器快慢无关。"""
+    result = None
+    for result, _ in anytime_paths(maze, start, end, deadline_ms, log=log):
+        pass
+    return result
+
+def hpa_search(maze, start, end, log=None):
+    # HPA* 在 hpa.py 中（它依赖本模块），用到时再导入
+    from hpa import hpa_search as search
+    return search(maze, start, end, log)
+
+# 算法名 -> 搜索函数，签名都是 (maze, start, end, log=None)
+SEARCHES = {"astar": astar_search, "dijkstra": dijkstra_search,
+            "jps": jps_search, "jps+": jps_plus_search, "alt": alt_search,
+            "bi-astar": bidirectional_astar_search, "bi-dijkstra": bidirectional_dijkstra_search,
+            "hpa": hpa_search, "wastar": weighted_astar_search, "ara": ara_search}
+
+# -----------------------
+# 批量查询：进程池共享只读迷宫
+# -----------------------
+# 迷宫（以及 JPS+ 的距离表）只放一份：来自 .npy 内存映射文件时各进程直接映射同一个文件，
+# 否则主进程把它拷进一块共享内存，子进程在初始化时挂上去，之后每个查询都不再复制网格。
+PathResult = namedtuple('PathResult', 'length cost expansions')
+QUERY_CHUNK = 64  # 每次发给子进程的查询数
+
+class ExpansionCounter:
+    """只统计扩展次数的 log，接口同 StepLog。"""
+
+    def __init__(self):
+        self.count = 0
+
+    def begin(self, cols, cell, g, h, side=0):
+        pass  # ARA* 每轮都会重新 begin，计数要累计所有轮；每个查询新建一个计数器
+
+    def add_root(self, cell, g, h, side=0):
+        pass
+
+    def record(self, cell, updates, side=0):
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+def _resolve_workers(workers):
+    if workers is None:
+        return os.cpu_count() or 1
+    return max(1, workers)
+
+def _share(array, blocks):
+    """返回可在子进程里重建 array 的描述；需要时新建共享内存并加入 blocks。"""
+    if isinstance(array, np.memmap) and array.filename and array.flags.c_contiguous:
+        return ('file', array.filename, array.offset, array.shape, array.dtype.str)
+    array = np.ascontiguousarray(array)
+    block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+    blocks.append(block)
+    return ('shm', block.name, 0, array.shape, array.dtype.str)
+
+def _attach(spec, blocks):
+    kind, name, offset, shape, dtype = spec
+    if kind == 'file':
+        return np.memmap(name, dtype=dtype, mode='r', offset=offset, shape=shape)
+    block = shared_memory.SharedMemory(name=name)
+    blocks.append(block)  # 保持引用，否则缓冲区会被释放
+    array = np.ndarray(shape, dtype, buffer=block.buf)
+    array.flags.writeable = False
+    return array
+
+_worker = {}  # 子进程中的 迷宫 / 搜索函数 / 共享内存引用
+
+def _init_worker(maze_spec, tables_spec, algorithm):
+    global jps_cache
+    blocks = []
+    maze = _attach(maze_spec, blocks)
+    if algorithm == "jps+":
+        jps_cache = (maze, jps_plus_views(_attach(tables_spec, blocks)))
+    elif algorithm == "alt":
+        use_landmarks(maze, _attach(tables_spec, blocks))
+    _worker.update(maze=maze, search=SEARCHES[algorithm], blocks=blocks)
+
+def _run_query(maze, search, query):
+    (sx, sy), (ex, ey) = query
+    counter = ExpansionCounter()
+    grid = search(maze, Grid(sx, sy), Grid(ex, ey), counter)
+    if grid is None:
+        return PathResult(None, None, counter.count)
+    cost = grid.g
+    length = 0
+    while grid.parent is not None:
+        grid = grid.parent
+        length += 1
+    return PathResult(length, cost, counter.count)
+
+def _run_chunk(queries):
+    return [_run_query(_worker['maze'], _worker['search'], q) for q in queries]
+
+def find_paths(maze, queries, algorithm="astar", workers=None, landmarks=None):
+    """对同一张迷宫批量求解 (起点, 终点) 查询，按顺序返回 PathResult 列表。
+
+    length 为路径步数、cost 为代价（直 10 / 斜 14），不可达（包括起点或终点是障碍）时二者为 None；
+    expansions 为扩展（关闭）的结点数。workers 为进程数，None 表示全部 CPU，
+    1 表示在当前进程中串行执行。algorithm="alt" 时可传入 select_landmarks
+    的结果（如 maze_io.cached_landmarks 读到的），否则现算一份。"""
+    if algorithm not in SEARCHES:
+        raise ValueError(f"未知算法 {algorithm!r}，可选：{', '.join(SEARCHES)}")
+    if not isinstance(maze, np.memmap):
+        maze = as_grid(maze)
+    queries = [((int(sx), int(sy)), (int(ex), int(ey))) for (sx, sy), (ex, ey) in queries]
+    workers = min(_resolve_workers(workers), max(1, len(queries) // QUERY_CHUNK))
+    if algorithm == "alt":
+        if landmarks is None:
+            landmarks = select_landmarks(maze)
+        use_landmarks(maze, landmarks)
+    if workers == 1:
+        search = SEARCHES[algorithm]
+        return [_run_query(maze, search, q) for q in queries]
+
+    blocks = []
+    try:
+        maze_spec = _share(maze, blocks)
+        tables_spec = None
+        if algorithm == "jps+":
+            tables_spec = _share(jps_plus_arrays(maze), blocks)
+        elif algorithm == "alt":
+            tables_spec = _share(landmarks, blocks)
+        chunks = [queries[i:i + QUERY_CHUNK] for i in range(0, len(queries), QUERY_CHUNK)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(maze_spec, tables_spec, algorithm)) as pool:
+            return [result for chunk in pool.map(_run_chunk, chunks) for result in chunk]
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
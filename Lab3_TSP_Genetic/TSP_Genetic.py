@@ -1,7 +1,10 @@
-import random
+import os
 from time import time
-from math import sqrt
+import multiprocessing as mp
+import numpy as np
 from matplotlib import pyplot as plt
+from crossover import CROSSOVERS
+from local_search import neighbor_index, improve_population
 plt.rcParams['font.sans-serif'] = ['SimHei']
 plt.rcParams['axes.unicode_minus'] = False
 cities = [
@@ -20,68 +23,234 @@ cities = [
 ]
 length = len(cities)
 
+### 种群表示：形状为 (popsize, length) 的整数数组，每行是一条路径（城市编号的排列）
+coords = np.array([(x, y) for _, x, y in cities])
+
+def distance_matrix(points):
+    diff = points[:, None, :] - points[None, :, :]
+    return np.hypot(diff[..., 0], diff[..., 1])
+
+dist = distance_matrix(coords) # 城市间距离只计算一次
+
+def init_population(size, rng):
+    # 每行对一组随机数排序得到一个随机排列；开启局部搜索时初代就先优化到局部最优
+    pops = rng.random((size, length)).argsort(axis=1).astype(np.int32)
+    if local_search:
+        pops = improve_population(pops, coords, candidate_neighbors())
+    return pops
+
 ### 路径长度（适应度）计算：路径越短，适应度越高
+def tour_costs(pops):
+    # 一次取出所有路径的所有边（第 i 个城市到第 i+1 个，最后一个回到起点）再按行求和
+    return dist[pops, np.roll(pops, -1, axis=1)].sum(axis=1)
+
 def path_cost(path):
-    cost = 0
-    for i in range(len(path)):
-        n1, x1, y1 = cities[path[i]]
-        if i<len(path)-1:
-            n2, x2, y2 = cities[path[i+1]]
-            dis = sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2)
-            cost += dis
-        else:
-            n2, x2, y2 = cities[path[0]]
-            dis = sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2)
-            cost += dis
-    return cost
-
-### 锦标赛选择函数
-def select(sample_size):
-    new_pops, new_costs = [], []
-    while len(new_pops) < popsize:
-        samples = random.sample(range(popsize),sample_size)
-        sample_costs = [costs[i] for i in samples]
-        new_costs.append(min(sample_costs))
-        best_sample_idx = samples[sample_costs.index(min(sample_costs))]
-        new_pops.append(pops[best_sample_idx])
-    return new_costs, new_pops
-
-### 交叉函数
-def cross(parent_pops1, parent_pops2):
-    child_pops = []
-    for i in range(popsize):
-        child = [None]*length
-        parent1 = parent_pops1[i]
-        parent2 = parent_pops2[i]
-        if random.random() > pcross: # 交叉概率应用
-            child = parent1.copy()
-        else:
-            # 随机生成交叉的起点和终点
-            start, end = sorted(random.sample(range(length),2))
-            # 复制parent1的中间段到child
-            child[start:end+1] = parent1[start:end+1].copy()
-            # 从parent2中按顺序填满child剩余位置
-            parent2_remain = [i for i in parent2 if i not in child[start:end+1]]
-            count = 0
-            for j in range(length):
-                if child[j] is None:
-                    child[j] = parent2_remain[count]
-                    count += 1
-        child_pops.append(child)
-    return child_pops
-
-### 变异函数
-def mutate(pops):
-    mutate_pops = []
-    for i in range(popsize):
-        if random.random() > pmutate:
-            mutate_pop = pops[i].copy()
-        else:
-            point1, point2 = random.sample(range(length),2)
-            mutate_pop = pops[i].copy()
-            mutate_pop[point1], mutate_pop[point2] = mutate_pop[point2], mutate_pop[point1]
-        mutate_pops.append(mutate_pop)
-    return mutate_pops
+    return float(tour_costs(np.asarray(path)[None, :])[0])
+
+### 锦标赛选择函数：每个位置一次性抽 sample_size 个（有放回），取其中路径最短的
+def select(pops, costs, sample_size, rng):
+    samples = rng.integers(len(pops), size=(len(pops), sample_size))
+    winners = samples[np.arange(len(pops)), costs[samples].argmin(axis=1)]
+    return costs[winners], pops[winners]
+
+### 交叉函数：crossover 选择的算子见 crossover.py
+def cross(parent_pops1, parent_pops2, rng):
+    # 交叉概率应用：不交叉的直接复制 parent1；同时返回哪些子代真正做了交叉
+    crossed = rng.random(len(parent_pops1)) <= pcross
+    child_pops = parent_pops1.copy()
+    child_pops[crossed] = CROSSOVERS[crossover](parent_pops1[crossed], parent_pops2[crossed], rng, dist)
+    return child_pops, crossed
+
+### 变异算子：对 tours 的每一行在位置 i、j 上做一次移动，返回 (新路径, 长度变化量)
+# 变化量只看改动的几条边，每行 O(1)，不必重新计算整条路径；下标都按环形取模
+def edge(tours, a, b):
+    rows = np.arange(len(tours))
+    n = tours.shape[1]
+    return dist[tours[rows, a % n], tours[rows, b % n]]
+
+def swap_move(tours, i, j):
+    # 交换 i、j 两个位置上的城市；相邻时共用的那条边只算一次
+    i, j = np.minimum(i, j), np.maximum(i, j)
+    n = tours.shape[1]
+    rows = np.arange(len(tours))
+    moved = tours.copy()
+    moved[rows, i], moved[rows, j] = tours[rows, j], tours[rows, i]
+    def around(t):
+        return (edge(t, i - 1, i) + edge(t, i, i + 1)
+                + np.where(j - 1 != i, edge(t, j - 1, j), 0)
+                + np.where((j + 1) % n != i, edge(t, j, j + 1), 0))
+    return moved, around(moved) - around(tours)
+
+def inversion_move(tours, i, j):
+    # 把 [i, j] 段反转（2-opt）：只有段两端的两条边变化
+    i, j = np.minimum(i, j), np.maximum(i, j)
+    n = tours.shape[1]
+    positions = np.arange(n)
+    inside = (positions >= i[:, None]) & (positions <= j[:, None])
+    index = np.where(inside, i[:, None] + j[:, None] - positions, positions)
+    moved = np.take_along_axis(tours, index, axis=1)
+    delta = (edge(tours, i - 1, j) + edge(tours, i, j + 1)
+             - edge(tours, i - 1, i) - edge(tours, j, j + 1))
+    # 整条路径反转时环不变
+    return moved, np.where((i == 0) & (j == n - 1), 0, delta)
+
+def insertion_move(tours, i, j):
+    # 把位置 i 的城市取出，插到新路径的位置 j
+    n = tours.shape[1]
+    rows = np.arange(len(tours))
+    positions = np.arange(n)
+    forward = (j > i)[:, None]
+    shift = np.where(forward,
+                     (positions >= i[:, None]) & (positions < j[:, None]),
+                     (positions > j[:, None]) & (positions <= i[:, None]))
+    index = np.where(shift, positions + np.where(forward, 1, -1), positions)
+    index[rows, j] = i
+    moved = np.take_along_axis(tours, index, axis=1)
+    city = tours[rows, i]
+    # 取出：前后两个城市直接相连；插入：新的前后城市之间的边被拆开
+    x, y = np.where(j > i, j, j - 1), np.where(j > i, j + 1, j)
+    before = tours[rows, x % n]
+    after = tours[rows, y % n]
+    delta = (edge(tours, i - 1, i + 1) - edge(tours, i - 1, i) - edge(tours, i, i + 1)
+             + dist[before, city] + dist[city, after] - dist[before, after])
+    # 第一个移到最后（或反过来）时环不变
+    return moved, np.where(np.abs(i - j) == n - 1, 0, delta)
+
+MUTATIONS = {"swap": swap_move, "inversion": inversion_move, "insertion": insertion_move}
+
+### 局部搜索（memetic）：变异后对改动过的子代做 2-opt / Or-opt，见 local_search.py
+# 候选城市只取 ls_neighbors 个最近邻；父代已是局部最优，所以只从与 parent1 相邻关系
+# 不同的城市开始检查（don't-look 位），每个子代的工作量只和改动的大小有关
+neighbor_cache = (None, None) # (近邻数, 近邻表)
+
+def candidate_neighbors():
+    global neighbor_cache
+    if neighbor_cache[0] != ls_neighbors:
+        neighbor_cache = (ls_neighbors, neighbor_index(coords, ls_neighbors))
+    return neighbor_cache[1]
+
+def improve(child_pops, child_costs, parent_pops):
+    rows = np.nonzero((child_pops != parent_pops).any(axis=1))[0]
+    if len(rows):
+        child_pops[rows] = improve_population(child_pops[rows], coords, candidate_neighbors(), parent_pops[rows])
+        child_costs[rows] = tour_costs(child_pops[rows])
+
+### 变异函数：按 mutation 选择的算子移动，costs 为变异前的路径长度，按变化量更新
+def mutate(pops, costs, rng):
+    count, n = pops.shape
+    mutate_pops, mutate_costs = pops.copy(), costs.copy()
+    rows = np.nonzero(rng.random(count) <= pmutate)[0]
+    point1 = rng.integers(n, size=len(rows))
+    point2 = (point1 + rng.integers(1, n, size=len(rows))) % n  # 保证两个位置不同
+    moved, delta = MUTATIONS[mutation](pops[rows], point1, point2)
+    mutate_pops[rows] = moved
+    mutate_costs[rows] += delta
+    return mutate_pops, mutate_costs
+
+### 一代进化：选择 -> 交叉 -> 变异 (-> 局部搜索)，子代与父种群一一对比保留较好的（原地修改 pops、costs）
+def next_generation(pops, costs, rng):
+    # 1、选择
+    selected_costs, selected_pops = select(pops, costs, 5, rng)
+    # 2、交叉：只有真正交叉出的子代需要完整计算路径长度，其余沿用 parent1 的
+    pops2 = selected_pops[rng.permutation(len(selected_pops))]
+    child_pops, crossed = cross(selected_pops, pops2, rng)
+    child_costs = selected_costs.copy()
+    child_costs[crossed] = tour_costs(child_pops[crossed])
+    # 3、变异：按移动的变化量更新路径长度
+    child_pops, child_costs = mutate(child_pops, child_costs, rng)
+    # 4、局部搜索（可选）
+    if local_search:
+        improve(child_pops, child_costs, selected_pops)
+    # 5、与父种群一一对比筛选出最好的
+    better = child_costs < costs
+    pops[better] = child_pops[better]
+    costs[better] = child_costs[better]
+
+### 岛屿模型：islands 个子种群各在一个进程里独立进化，每 migrate_every 代交换一次最优个体
+# 主进程只负责转发：各岛把最好的 migrants 条路径（int32 数组）和这段时间每代的最优长度发上来，
+# 主进程按拓扑（"ring"：发给下一个岛；"random"：随机错排，每个岛恰好收到别的岛的一批）
+# 发回去，岛上用它们替换最差的个体。进程之间只传这些小数组，种群始终留在各自的进程里。
+def best_rows(costs, count):
+    rows = np.argpartition(costs, count - 1)[:count] if count < len(costs) else np.arange(len(costs))
+    return rows[np.argsort(costs[rows])]
+
+def island_worker(index, seed, inbox, outbox, size, settings):
+    # 子进程入口：settings 为主进程中的交叉 / 变异参数（spawn 启动的子进程不会继承修改过的全局变量）
+    globals().update(settings)
+    rng = np.random.default_rng(seed)
+    pops = init_population(size, rng)
+    costs = tour_costs(pops)
+    count = settings["migrants"]
+    while True:
+        steps = inbox.get()
+        if steps is None:
+            return
+        history = []
+        for _ in range(steps):
+            next_generation(pops, costs, rng)
+            history.append(costs.min())
+        rows = best_rows(costs, count)
+        outbox.put((index, pops[rows], costs[rows], history))
+        immigrants = inbox.get()
+        if immigrants is None:
+            return
+        worst = np.argsort(costs)[-len(immigrants[0]):]
+        pops[worst], costs[worst] = immigrants
+
+def migration_targets(islands, rng):
+    if topology == "ring":
+        return [(i + 1) % islands for i in range(islands)]
+    while True:
+        order = rng.permutation(islands)
+        if islands == 1 or (order != np.arange(islands)).all():
+            return order.tolist()
+
+def island_ga(islands=None, generations=None, size=None, seed=None, target=None):
+    """运行岛屿模型，返回 (最优长度, 最优路径, 每代的全局最优长度)。
+
+    islands 为岛屿（进程）数，None 表示全部 CPU；size 为每个岛的种群大小；
+    target 不为 None 时，全局最优不超过 target 就在这次迁移后提前结束。"""
+    islands = islands or os.cpu_count() or 1
+    generations = generations or generation
+    size = size or popsize
+    rng = np.random.default_rng(seed)
+    seeds = np.random.SeedSequence(seed).spawn(islands)
+    settings = {"pcross": pcross, "crossover": crossover, "pmutate": pmutate,
+                "mutation": mutation, "migrants": migrants,
+                "local_search": local_search, "ls_neighbors": ls_neighbors}
+    outbox = mp.Queue()
+    inboxes = [mp.Queue() for _ in range(islands)]
+    workers = [mp.Process(target=island_worker, args=(i, seeds[i], inboxes[i], outbox, size, settings), daemon=True)
+               for i in range(islands)]
+    for worker in workers:
+        worker.start()
+    best_cost, best_pop, best_cost_list = np.inf, None, []
+    try:
+        done = 0
+        while done < generations:
+            steps = min(migrate_every, generations - done)
+            for inbox in inboxes:
+                inbox.put(steps)
+            batches = [None] * islands
+            for _ in range(islands):
+                index, tours, elite_costs, history = outbox.get()
+                batches[index] = (tours, elite_costs, history)
+            done += steps
+            for gen in range(steps):
+                best_cost_list.append(min(best_cost, min(batch[2][gen] for batch in batches)))
+            for tours, elite_costs, _ in batches:
+                if elite_costs[0] < best_cost:
+                    best_cost, best_pop = elite_costs[0], tours[0].copy()
+            if done >= generations or (target is not None and best_cost <= target):
+                break
+            for i, to in enumerate(migration_targets(islands, rng)):
+                inboxes[to].put(batches[i][:2])
+    finally:
+        for inbox in inboxes:
+            inbox.put(None)
+        for worker in workers:
+            worker.join()
+    return best_cost, best_pop, best_cost_list
 
 ### 最佳路径可视化
 def best_path_visible(path, best_cost):
@@ -128,53 +297,45 @@ def plot_cost_history(cost_history):
 generation = 500 # 迭代次数
 popsize = 300 # 种群大小
 pcross = 0.9 # 交叉概率
+crossover = "ox" # 交叉算子："ox" / "pmx" / "eax"
 pmutate = 0.1 # 变异概率
+mutation = "swap" # 变异算子："swap" / "inversion" / "insertion"
+local_search = False # 是否在变异后对子代做 2-opt / Or-opt 局部搜索
+ls_neighbors = 8 # 局部搜索中每个城市的候选近邻数
+islands = 1 # 岛屿（进程）数，大于 1 时使用岛屿模型，popsize 为每个岛的种群大小
+migrate_every = 50 # 每隔多少代迁移一次
+migrants = 5 # 每次迁出的最优个体数
+topology = "ring" # 迁移拓扑："ring" / "random"
 
 if __name__ == '__main__':
     start_time = time()
-    pops = [random.sample(range(len(cities)),len(cities))
-            for _ in range(popsize)] # 初始化种群
-    ### 计算初代种群最优值
-    costs = [None]*popsize
-    for i in range(popsize):
-        costs[i] = path_cost(pops[i])
-    best_cost = min(costs)
-    best_pop = pops[costs.index(best_cost)]
-    print(f"初代最优路径长度: {best_cost:.2f}")
-    best_cost_list = []
-    best_cost_list.append(best_cost)
-    ### 主循环
-    for gen in range(generation):
-        # 1、选择
-        _, selected_pops = select(sample_size=5)
-        # 2、交叉
-        pops1 = selected_pops.copy()
-        pops2 = selected_pops.copy()
-        random.shuffle(pops2)
-        child_pops = cross(pops1, pops2)
-        # 3、变异
-        child_pops = mutate(child_pops)
-        # 4、计算子代路径距离
-        child_costs = [None]*popsize
-        for i in range(popsize):
-            child_costs[i] = path_cost(child_pops[i])
-        best_child_cost = min(child_costs)
-        # 5、与父种群一一对比筛选出最好的
-        for i in range(popsize):
-            if child_costs[i] < costs[i]:
-                costs[i] = child_costs[i]
-                pops[i] = child_pops[i]
-        if best_cost > best_child_cost:
-            best_cost = best_child_cost
-            best_pop = pops[costs.index(best_cost)]
-
+    if islands > 1:
+        best_cost, best_pop, best_cost_list = island_ga(islands)
+        print(f"{islands} 个岛，每个岛 {popsize} 个个体，每 {migrate_every} 代迁移 {migrants} 个（{topology}）")
+    else:
+        rng = np.random.default_rng()
+        pops = init_population(popsize, rng) # 初始化种群
+        ### 计算初代种群最优值
+        costs = tour_costs(pops)
+        best_cost = costs.min()
+        best_pop = pops[costs.argmin()].copy()
+        print(f"初代最优路径长度: {best_cost:.2f}")
+        best_cost_list = []
         best_cost_list.append(best_cost)
-        if gen % 50 == 0:
-            print(f"第{gen}代最优路径长度: {best_cost:.2f}")
+        ### 主循环
+        for gen in range(generation):
+            next_generation(pops, costs, rng)
+            if costs.min() < best_cost:
+                best_cost = costs.min()
+                best_pop = pops[costs.argmin()].copy()
+
+            best_cost_list.append(best_cost)
+            if gen % 50 == 0:
+                print(f"第{gen}代最优路径长度: {best_cost:.2f}")
 
     end_time = time()
     print(f"最终最优路径长度: {best_cost:.2f}")
-    print(f"最终最优路径：{best_pop}")
+    print(f"最终最优路径：{best_pop.tolist()}")
     print(f"运行时间为：{end_time-start_time:.4f}秒")
     plot_cost_history(best_cost_list)
-    best_path_visible(best_pop, best_cost)
\ No newline at end of file
+    best_path_visible(best_pop, best_cost)
@@ -0,0 +1,199 @@
+import heapq
+
+import numpy as np
+
+### 交叉算子：parents1、parents2 为形状相同的 (count, N) 路径数组，返回同形状的子代数组
+### 统一签名 (parents1, parents2, rng, dist)，dist 为城市间距离矩阵（OX / PMX 用不到）
+### OX、PMX 对整批一起计算，靠"标记数组"（城市是否在中间段）和"位置数组"（城市在父代中的下标）
+### 代替 in 列表查找，每个子代 O(N)；EAX 逐对计算
+
+EAX_NEIGHBORS = 10 # EAX 合并子环时每个城市考察的近邻数
+
+def random_segments(count, n, rng):
+    # 每行随机取两个不同的位置作为中间段 [start, end]，返回段的布尔掩码
+    point1 = rng.integers(n, size=count)
+    point2 = (point1 + rng.integers(1, n, size=count)) % n
+    start, end = np.minimum(point1, point2), np.maximum(point1, point2)
+    positions = np.arange(n)
+    return (positions >= start[:, None]) & (positions <= end[:, None])
+
+def segment_marks(parents, segment):
+    # marks[r, 城市] 表示该城市是否在第 r 行 parents 的中间段里
+    marks = np.zeros(parents.shape, dtype=bool)
+    marks[np.nonzero(segment)[0], parents[segment]] = True
+    return marks
+
+### 顺序交叉 OX：中间段来自 parent1，parent2 中其余城市按原顺序从左到右填入段外的位置
+def order_crossover(parents1, parents2, rng, dist=None):
+    count, n = parents1.shape
+    segment = random_segments(count, n, rng)
+    marks = segment_marks(parents1, segment)
+    keep = ~marks[np.arange(count)[:, None], parents2]
+    children = np.empty_like(parents1)
+    children[segment] = parents1[segment]
+    # 每行段外位置数与 parent2 中保留的城市数相同，按行优先顺序一一对应
+    children[~segment] = parents2[keep]
+    return children
+
+### 部分映射交叉 PMX：中间段来自 parent1，段外取 parent2 的城市；
+### 若该城市已在段中，就沿"parent1 段中的位置 -> parent2 同位置的城市"映射下去，直到不冲突
+def partially_mapped_crossover(parents1, parents2, rng, dist=None):
+    count, n = parents1.shape
+    rows = np.arange(count)[:, None]
+    segment = random_segments(count, n, rng)
+    marks = segment_marks(parents1, segment)
+    position1 = np.empty_like(parents1)
+    position1[rows, parents1] = np.arange(n)
+    children = parents2.copy()
+    children[segment] = parents1[segment]
+    r, c = np.nonzero(~segment & marks[rows, parents2])
+    city = parents2[r, c]
+    # 各条映射链互不相交，总步数不超过段长
+    while len(r):
+        city = parents2[r, position1[r, city]]
+        done = ~marks[r, city]
+        children[r[done], c[done]] = city[done]
+        r, c, city = r[~done], c[~done], city[~done]
+    return children
+
+### 边组装交叉 EAX（每对父代取一个 AB 环）
+# 1、A、B 的边交替相连组成 AB 环（两者共有的边先去掉）；
+# 2、随机取一个 AB 环，从 A 中删去环上 A 的边、加上环上 B 的边，得到若干个子环；
+# 3、每次把最小的子环和别的子环合并：拆开两边各一条边 (u, u')、(v, v')，
+#    改连 (u, v)、(u', v') 或 (u, v')、(u', v) 中较短的一种，v 只在 u 的近邻里找。
+# 得到的子代保留了 A 的大部分边，只引入 B 的一小块结构，适合 TSP。
+neighbor_cache = (None, None) # (距离矩阵, 近邻表)，同一个矩阵只算一次
+
+def nearest_neighbors(dist, k):
+    global neighbor_cache
+    if neighbor_cache[0] is not dist or neighbor_cache[1].shape[1] < min(k, len(dist) - 1):
+        k = min(k, len(dist) - 1)
+        order = np.argpartition(dist, k, axis=1)[:, :k + 1]
+        # 去掉自身后按距离排序
+        order = np.array([[c for c in row[np.argsort(dist[i, row])] if c != i][:k]
+                          for i, row in enumerate(order)])
+        neighbor_cache = (dist, order)
+    return neighbor_cache[1][:, :k]
+
+def tour_adjacency(tour):
+    n = len(tour)
+    adj = [None] * n
+    for i, c in enumerate(tour):
+        adj[c] = [tour[i - 1], tour[(i + 1) % n]]
+    return adj
+
+def ab_cycle(adj_a, adj_b, rng):
+    # 去掉共有边后，每个城市剩下的 A 边与 B 边数目相等，从任一城市出发交替走 A、B 边
+    # 一定会在走完一条 B 边时回到起点，得到一个 AB 环（城市序列，第 i 条边 A/B 交替）
+    rest_a = [[d for d in adj_a[c] if d not in adj_b[c]] for c in range(len(adj_a))]
+    rest_b = [[d for d in adj_b[c] if d not in adj_a[c]] for c in range(len(adj_b))]
+    # 先按随机顺序从各城市出发把所有 AB 环都找出来，再随机取一个
+    cycles = []
+    for start in rng.permutation(len(rest_a)).tolist():
+        while rest_a[start]:
+            walk = [start]
+            current, use_a = start, True
+            while True:
+                rest = rest_a if use_a else rest_b
+                nxt = rest[current][int(rng.integers(len(rest[current])))]
+                rest[current].remove(nxt)
+                rest[nxt].remove(current)
+                walk.append(nxt)
+                current, use_a = nxt, not use_a
+                if use_a and current == start:
+                    break
+            cycles.append(walk)
+    if not cycles:
+        return None
+    return cycles[int(rng.integers(len(cycles)))]
+
+def merge_subtours(adj, dist, neighbors):
+    """adj 为 (n, 2) 的邻接数组（每个城市度为 2，可能构成多个子环），原地合并成一个环。"""
+    n = len(adj)
+    # 给每个城市标上所在子环的编号
+    links = adj.tolist()
+    component = np.full(n, -1)
+    members = []
+    for c in range(n):
+        if component[c] >= 0:
+            continue
+        label, cycle = len(members), []
+        prev, current = -1, c
+        while component[current] < 0:
+            component[current] = label
+            cycle.append(current)
+            a, b = links[current]
+            prev, current = current, (b if a == prev else a)
+        members.append(cycle)
+    # 按子环大小取最小的；合并后变大的子环在堆里的旧条目取出时重新放回
+    heap = [(len(cycle), label) for label, cycle in enumerate(members)]
+    heapq.heapify(heap)
+    remaining = len(members)
+    while remaining > 1:
+        size, small = heapq.heappop(heap)
+        if size != len(members[small]):
+            if members[small]:
+                heapq.heappush(heap, (len(members[small]), small))
+            continue
+        # 子环内每条边 (u, u2) 与 u 的近邻 v 所在的边 (v, v2) 一次算出两种改连方式的增量
+        u = np.array(members[small])
+        v = neighbors[u]
+        outside = component[v] != small
+        if outside.any():
+            u2, v2 = adj[u], adj[v]                            # (|U|, 2)、(|U|, k, 2)
+            u, u2 = u[:, None, None, None], u2[:, :, None, None]
+            v, v2 = v[:, None, :, None], v2[:, None, :, :]
+            base = dist[u, u2] + dist[v, v2]
+            gains = np.stack([dist[u, v] + dist[u2, v2], dist[u, v2] + dist[u2, v]]) - base
+            gains = np.where(outside[None, :, None, :, None], gains, np.inf)
+            way, a, b, c, d = np.unravel_index(int(gains.argmin()), gains.shape)
+            u, u2, v, v2 = int(u[a, 0, 0, 0]), int(u2[a, b, 0, 0]), int(v[a, 0, c, 0]), int(v2[a, 0, c, d])
+            x, y = (v, v2) if way == 0 else (v2, v)
+        else:
+            # 近邻全在同一个子环里：退回在所有城市中找离 u 最近的
+            u = members[small][0]
+            u2 = int(adj[u, 0])
+            x = int(np.where(component != small, dist[u], np.inf).argmin())
+            y = int(adj[x, 0])
+        # 拆开 (u, u2)、(x, y)，连上 (u, x)、(u2, y)
+        for p, old, new in ((u, u2, x), (u2, u, y), (x, y, u), (y, x, u2)):
+            adj[p, int(adj[p, 1] == old)] = new
+        target = component[x]
+        component[members[small]] = target
+        members[target] += members[small]
+        members[small] = []
+        remaining -= 1
+
+def eax_child(tour_a, tour_b, dist, neighbors, rng):
+    adj_a = tour_adjacency(tour_a)
+    cycle = ab_cycle(adj_a, tour_adjacency(tour_b), rng)
+    if cycle is None:
+        return list(tour_a) # A、B 是同一个环
+    adj = [list(pair) for pair in adj_a]
+    for i in range(0, len(cycle) - 1, 2): # A 边
+        c, d = cycle[i], cycle[i + 1]
+        adj[c].remove(d)
+        adj[d].remove(c)
+    for i in range(1, len(cycle) - 1, 2): # B 边
+        c, d = cycle[i], cycle[i + 1]
+        adj[c].append(d)
+        adj[d].append(c)
+    adj = np.array(adj)
+    merge_subtours(adj, dist, neighbors)
+    links = adj.tolist()
+    child = [tour_a[0]]
+    prev = -1
+    while len(child) < len(tour_a):
+        a, b = links[child[-1]]
+        child.append(b if a == prev else a)
+        prev = child[-2]
+    return child
+
+def edge_assembly_crossover(parents1, parents2, rng, dist):
+    neighbors = nearest_neighbors(dist, EAX_NEIGHBORS)
+    children = np.empty_like(parents1)
+    for i, (a, b) in enumerate(zip(parents1.tolist(), parents2.tolist())):
+        children[i] = eax_child(a, b, dist, neighbors, rng)
+    return children
+
+CROSSOVERS = {"ox": order_crossover, "pmx": partially_mapped_crossover, "eax": edge_assembly_crossover}
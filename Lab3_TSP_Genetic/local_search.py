@@ -0,0 +1,212 @@
+from collections import deque
+from math import hypot
+
+import numpy as np
+
+### 局部搜索：2-opt 与 Or-opt，候选只取每个城市的 k 个最近邻，配合 don't-look 位
+### 距离直接由坐标计算，不需要 N x N 的距离矩阵，上万个城市也能用
+### 路径存成 tour（位置 -> 城市）和 pos（城市 -> 位置）两个列表，按环形取下标
+
+NEIGHBOR_K = 8 # 每个城市的候选近邻数
+OR_OPT_MAX = 3 # Or-opt 一次移动的最大段长
+EPS = 1e-9     # 小于该值的改进视为没有改进，避免浮点误差导致来回移动
+
+### 近邻索引：把城市放进均匀网格（平均每格约 2 个城市），从所在格子向外逐圈扩大，
+### 直到第 k 近的距离不超过已搜索方框的内半径，结果就是精确的 k 近邻
+def neighbor_index(coords, k=NEIGHBOR_K):
+    """返回形状为 (N, k) 的近邻表，每行按距离从近到远排列。"""
+    coords = np.asarray(coords, dtype=np.float64)
+    n = len(coords)
+    k = min(k, n - 1)
+    lo = coords.min(axis=0)
+    span = float((coords.max(axis=0) - lo).max()) or 1.0
+    side = max(1, int(np.sqrt(n / 2)))
+    size = span / side
+    cell = np.minimum(((coords - lo) / size).astype(np.int64), side - 1)
+    key = cell[:, 0] * side + cell[:, 1]
+    order = np.argsort(key, kind='stable')
+    bounds = np.searchsorted(key[order], np.arange(side * side + 1))
+    result = np.empty((n, k), dtype=np.int32)
+    for cell_key in np.unique(key).tolist():
+        members = order[bounds[cell_key]:bounds[cell_key + 1]]
+        cx, cy = divmod(cell_key, side)
+        radius = 1
+        while True:
+            x0, x1 = max(0, cx - radius), min(side - 1, cx + radius)
+            y0, y1 = max(0, cy - radius), min(side - 1, cy + radius)
+            # 同一行格子的编号连续，每行取一段
+            candidates = np.concatenate([order[bounds[x * side + y0]:bounds[x * side + y1 + 1]]
+                                         for x in range(x0, x1 + 1)])
+            whole = x0 == 0 and y0 == 0 and x1 == side - 1 and y1 == side - 1
+            if len(candidates) > k:
+                diff = coords[members][:, None, :] - coords[candidates][None, :, :]
+                d = np.hypot(diff[..., 0], diff[..., 1])
+                d[members[:, None] == candidates[None, :]] = np.inf
+                nearest = np.argpartition(d, k - 1, axis=1)[:, :k]
+                nearest_d = np.take_along_axis(d, nearest, axis=1)
+                if whole or nearest_d.max() <= radius * size:
+                    break
+            radius += 1
+        nearest = np.take_along_axis(nearest, nearest_d.argsort(axis=1), axis=1)
+        result[members] = candidates[nearest]
+    return result
+
+### 单条路径的局部搜索
+def improve_tour(tour, xs, ys, neighbors, active=None):
+    """对 tour（城市列表）反复做改进的 2-opt / Or-opt 移动，直到没有可改进的移动。
+
+    xs、ys 为坐标列表，neighbors 为近邻表（列表的列表）；active 为最初需要检查的城市，
+    None 表示全部。返回 (新路径列表, 缩短的长度)。"""
+    tour = list(tour)
+    n = len(tour)
+    if n < 5:
+        return tour, 0.0
+    pos = [0] * n
+    for i, c in enumerate(tour):
+        pos[c] = i
+
+    def dist(a, b):
+        return hypot(xs[a] - xs[b], ys[a] - ys[b])
+
+    def succ(c):
+        return tour[(pos[c] + 1) % n]
+
+    def pred(c):
+        return tour[pos[c] - 1]
+
+    def write(start, cities):
+        # 从位置 start 起依次写入 cities（环形）
+        for offset, c in enumerate(cities):
+            i = (start + offset) % n
+            tour[i] = c
+            pos[c] = i
+
+    def span(a, b):
+        # 从 a 沿正方向走到 b 经过的城市（含两端）
+        i, j = pos[a], pos[b]
+        return tour[i:j + 1] if i <= j else tour[i:] + tour[:j + 1]
+
+    def reverse(a, b):
+        # 把 a -> b 这一段反转；比另一侧长时改为反转另一侧，得到的是同一个环
+        length = (pos[b] - pos[a]) % n + 1
+        if 2 * length > n:
+            a, b = succ(b), pred(a)
+        write(pos[a], span(a, b)[::-1])
+
+    def two_opt(a):
+        for forward in (True, False):
+            b = succ(a) if forward else pred(a)
+            d_ab = dist(a, b)
+            for c in neighbors[a]:
+                d_ac = dist(a, c)
+                if d_ac >= d_ab - EPS:
+                    break # 近邻按距离排序，后面的更远
+                d = succ(c) if forward else pred(c)
+                if c == b or d == a:
+                    continue
+                delta = d_ac + dist(b, d) - d_ab - dist(c, d)
+                if delta < -EPS:
+                    # 正向：a b ... c d -> a c ... b d；反向：d c ... b a 对称处理
+                    if forward:
+                        reverse(b, c)
+                    else:
+                        reverse(a, d)
+                    return [a, b, c, d], -delta
+        return None, 0.0
+
+    def or_opt(a):
+        for length in range(1, OR_OPT_MAX + 1):
+            if n < length + 3:
+                break
+            segment = [a]
+            for _ in range(length - 1):
+                segment.append(succ(segment[-1]))
+            e = segment[-1]
+            p, q = pred(a), succ(e)
+            removed = dist(p, a) + dist(e, q) - dist(p, q)
+            if removed <= EPS:
+                continue
+            inside = set(segment)
+            best = None
+            for end in (a, e):
+                for c in neighbors[end]:
+                    if dist(end, c) >= removed - EPS:
+                        break
+                    if c in inside:
+                        continue
+                    for x, y in ((c, succ(c)), (pred(c), c)):
+                        if y in inside or x in inside or (x == p and y == q):
+                            continue
+                        base = dist(x, y) + removed
+                        for delta, flipped in ((dist(x, a) + dist(e, y) - base, False),
+                                               (dist(x, e) + dist(a, y) - base, True)):
+                            if delta < -EPS and (best is None or delta < best[0]):
+                                best = (delta, x, y, flipped)
+            if best is None:
+                continue
+            delta, x, y, flipped = best
+            moved = segment[::-1] if flipped else segment
+            # 环上的顺序为 段、q..x、y..p；把段移到 x、y 之间只需交换段与较短的一侧
+            before = (pos[x] - pos[q]) % n + 1
+            if before <= n - length - before:
+                write(pos[a], span(q, x) + moved)
+            else:
+                write(pos[y], moved + span(y, p))
+            return [p, q, a, e, x, y], -delta
+        return None, 0.0
+
+    queue = deque(range(n) if active is None else active)
+    queued = [False] * n
+    for c in queue:
+        queued[c] = True
+    gain = 0.0
+    while queue:
+        a = queue.popleft()
+        queued[a] = False
+        touched, improved = two_opt(a)
+        if touched is None:
+            touched, improved = or_opt(a)
+        if touched is None:
+            continue # don't-look 位：直到相邻的边变化前不再检查 a
+        gain += improved
+        for c in touched:
+            if not queued[c]:
+                queued[c] = True
+                queue.append(c)
+    return tour, gain
+
+### 对一批路径做局部搜索
+def improve_population(tours, coords, neighbors, parents=None):
+    """逐行改进 tours（(count, N) 数组），返回新数组。
+
+    给出 parents 时，只从与对应父代相邻关系不同的城市开始检查（父代已是局部最优时，
+    子代只有交叉 / 变异改动的地方可能改进）；否则从全部城市开始。"""
+    xs, ys = coords[:, 0].tolist(), coords[:, 1].tolist()
+    neighbor_lists = neighbors.tolist()
+    improved = tours.copy()
+    active = None
+    if parents is not None:
+        changed = adjacency_changes(tours, parents)
+    for i, row in enumerate(tours.tolist()):
+        if parents is not None:
+            active = np.nonzero(changed[i])[0].tolist()
+            if not active:
+                continue
+        improved[i] = improve_tour(row, xs, ys, neighbor_lists, active)[0]
+    return improved
+
+def adjacency_changes(tours, parents):
+    # changed[r, 城市] 表示该城市在 tours 中的前驱或后继与 parents 中不同
+    count, n = tours.shape
+    rows = np.arange(count)[:, None]
+    def neighbors_of(t):
+        nxt = np.empty_like(t)
+        prv = np.empty_like(t)
+        nxt[rows, t] = np.roll(t, -1, axis=1)
+        prv[rows, t] = np.roll(t, 1, axis=1)
+        return nxt, prv
+    nxt_t, prv_t = neighbors_of(tours)
+    nxt_p, prv_p = neighbors_of(parents)
+    # 方向相反的同一个环也视为相同
+    same = ((nxt_t == nxt_p) & (prv_t == prv_p)) | ((nxt_t == prv_p) & (prv_t == nxt_p))
+    return ~same